@@ -0,0 +1,72 @@
+import argparse
+import random
+
+from Quantile_sketch import KLLSketch, rank_error
+
+# Sketch sizes checked, as k or as epsilon (see k_for_error)
+SKETCH_SIZES = [{"k": 20}, {"k": 50}, {"k": 200}, {"epsilon": 0.05}, {"epsilon": 0.02}]
+
+# Streams of n numbers; sorted, reversed and few distinct values are the
+# orders and ties a compactor sees least often on random input
+STREAMS = {
+     "uniform": lambda n, rng: [rng.random() for _ in range(n)],
+     "exponential": lambda n, rng: [rng.expovariate(1.0) for _ in range(n)],
+     "sorted": lambda n, rng: list(range(n)),
+     "reversed": lambda n, rng: list(range(n, 0, -1)),
+     "few_distinct": lambda n, rng: [rng.randrange(10) for _ in range(n)],
+}
+
+
+def sketches(data, size, seed, parts, exact_limit):
+     """A sketch of data pushed into one KLLSketch, and one merged from
+     `parts` sketches of consecutive slices of it (each with its own seed)."""
+     single = KLLSketch(**size, exact_limit=exact_limit, seed=seed).update(data)
+     step = -(-len(data) // parts)
+     merged = KLLSketch(**size, exact_limit=exact_limit, seed=seed)
+     for i in range(0, len(data), step):
+          part = KLLSketch(**size, exact_limit=exact_limit, seed=seed * parts + i // step + 1)
+          merged.merge(part.update(data[i:i + step]))
+     return {"single": single, "merged": merged}
+
+
+def check_sketch(seeds=range(5), n=20000, parts=4):
+     """
+     Pushes every stream of STREAMS into sketches of every SKETCH_SIZES,
+     single and merged, and checks that the measured rank error
+     (rank_error, every 1% quantile) is within the sketch's error() bound.
+     Streams of n items are checked in approximate mode (exact_limit=0)
+     and streams that fit in exact_limit must be answered exactly.
+
+     Returns:
+          list: (stream, size, kind, seed, measured error, bound) for every
+               sketch over its bound; empty if all of them are within it.
+     """
+     failures = []
+     for seed in seeds:
+          rng = random.Random(seed)
+          for stream, make in STREAMS.items():
+               data = make(n, rng)
+               for size in SKETCH_SIZES:
+                    for exact_limit, items in ((0, data), (n, data[:n // 2])):
+                         for kind, sketch in sketches(items, size, seed, parts, exact_limit).items():
+                              if sketch.exact != (exact_limit > 0):
+                                   failures.append((stream, size, kind, seed, "exact mode", exact_limit > 0))
+                                   continue
+                              error = rank_error(sketch, items)
+                              if error > sketch.error():
+                                   failures.append((stream, size, kind, seed, error, sketch.error()))
+     return failures
+
+
+if __name__ == "__main__":
+     parser = argparse.ArgumentParser(description="Check the rank error bound of KLLSketch")
+     parser.add_argument("--seeds", type=int, default=5, help="Number of seeds (0, 1, ...) checked")
+     parser.add_argument("--n", type=int, default=20000, help="Length of each stream")
+     args = parser.parse_args()
+
+     failures = check_sketch(range(args.seeds), args.n)
+     for stream, size, kind, seed, error, bound in failures[:10]:
+          print(f"{kind} sketch {size} of {stream} (seed {seed}): error {error}, bound {bound}")
+     checked = args.seeds * len(STREAMS) * len(SKETCH_SIZES) * 4
+     print(f"{checked} sketches checked, {len(failures)} over their error bound")
+     raise SystemExit(1 if failures else 0)
@@ -1,4 +1,7 @@
+import math
 import random
+import time
+from bisect import bisect_left, bisect_right
 # the time complexity in worst case for this algorithm is O(n^2)
 def partition(A, low, high):
     # Check if all elements in the subarray are equal
@@ -55,7 +58,210 @@ def randomized_Select(A : list, low : int, high : int , i : int) -> int | float:
      
      
      
-b = []  
-b = [1 , 5, 46, 7 , 4 , 6 , 12 , 0 , 4 , 2]
-b = randomized_Select(b , 0 , (len(b) - 1) , 6 )
-print(b)
\ No newline at end of file
+# Introselect: iterative selection with three-way partitioning. Pivots are the
+# median of three random elements; after INTROSELECT_STALLS partitions in a
+# row that each keep more than 3/4 of the range, the next pivot is the
+# median of medians, which guarantees a 30/70 split. So the range shrinks
+# geometrically even for the worst luck, and the only recursion is the
+# median-of-medians call on the n/5 group medians.
+# Time complexity: O(n) worst case
+# Memory Order: O(log n) (nested median-of-medians calls)
+
+INTROSELECT_CUTOFF = 16
+INTROSELECT_STALLS = 3
+
+def partition3(A, low, high, pivot):
+     """Three-way partition of A[low..high] around a pivot value that occurs
+     in it; returns (lt, gt) such that A[lt..gt] are the elements equal to
+     the pivot, with the smaller ones before and the larger ones after.
+     Two Lomuto-style passes (smaller, then equal) are faster in Python than
+     a single Dutch national flag pass."""
+     lt = low
+     for j in range(low, high + 1):
+          x = A[j]
+          if x < pivot:
+               A[j] = A[lt]
+               A[lt] = x
+               lt += 1
+     gt = lt
+     for j in range(lt, high + 1):
+          x = A[j]
+          if not pivot < x:
+               A[j] = A[gt]
+               A[gt] = x
+               gt += 1
+     return lt, gt - 1
+
+def median_of_three(A, low, high):
+     """Median value of three random elements of A[low..high]."""
+     a = A[random.randint(low, high)]
+     b = A[random.randint(low, high)]
+     c = A[random.randint(low, high)]
+     if a < b:
+          return b if b < c else (c if a < c else a)
+     return a if a < c else (c if b < c else b)
+
+def median_of_medians(A, low, high):
+     """Pivot value of the deterministic SELECT: the median of the medians of
+     the groups of 5 in A[low..high]. The group medians are moved to the
+     front of the range, A[low..low + g - 1], and selected there."""
+     g = (high - low + 1) // 5
+     for j in range(g):
+          start = low + 5 * j
+          A[start:start + 5] = sorted(A[start:start + 5])
+          swap(A, low + j, start + 2)
+     return introselect(A, low + (g - 1) // 2, low, low + g - 1)
+
+def introselect(A : list, k : int, low : int = 0, high : int = None, stats : dict = None) -> int | float:
+     """finds the element of rank k (0-based) in A[low..high], i.e.
+     sorted(A[low:high + 1])[k - low], in Θ(n) worst case without recursion
+     on the partitions
+
+     A is rearranged like C++'s nth_element: A[k] holds the answer, the
+     elements before it are not larger and the elements after it are not smaller.
+
+     Args:
+         A (Array/List): The intended array
+         k (int): index of the wanted element in sorted order, low <= k <= high
+         low (int): first index of the range (default 0)
+         high (int): last index of the range (default len(A) - 1)
+         stats (dict, optional): receives the number of `partitions` and
+             how many of them used the median-of-medians pivot (`fallbacks`)
+
+     Returns:
+         the element of rank k
+     """
+     high = len(A) - 1 if high is None else high
+     if not low <= k <= high:
+          raise IndexError(f"rank {k} is outside of A[{low}..{high}]")
+     partitions = fallbacks = stalls = 0
+     while high - low >= INTROSELECT_CUTOFF:
+          size = high - low + 1
+          if stalls >= INTROSELECT_STALLS:
+               pivot = median_of_medians(A, low, high)
+               fallbacks += 1
+               stalls = 0
+          else:
+               pivot = median_of_three(A, low, high)
+          lt, gt = partition3(A, low, high, pivot)
+          partitions += 1
+          if k < lt:
+               high = lt - 1
+          elif k > gt:
+               low = gt + 1
+          else:
+               low = high = k  # A[k] equals the pivot
+               break
+          stalls = stalls + 1 if 4 * (high - low + 1) > 3 * size else 0
+     A[low:high + 1] = sorted(A[low:high + 1])
+     if stats is not None:
+          stats["partitions"] = partitions
+          stats["fallbacks"] = fallbacks
+     return A[k]
+
+# Multi-select: the introselect loop for several ranks at once. After a
+# partition, only the sides that still hold requested ranks are kept (on an
+# explicit stack), so every part of A is partitioned once for all the ranks
+# in it instead of once per rank.
+# Time complexity: O(n lg k) worst case for k distinct ranks
+
+def select_many(A : list, ranks, low : int = 0, high : int = None) -> list:
+     """finds the elements of several ranks (0-based) of A[low..high] at once
+
+     A is rearranged so that A[k] holds the element of rank k for every
+     requested k, with A partitioned around each of them (see introselect).
+
+     Args:
+         A (Array/List): The intended array
+         ranks (iterable): indexes of the wanted elements in sorted order,
+             each with low <= k <= high; duplicates are allowed
+         low (int): first index of the range (default 0)
+         high (int): last index of the range (default len(A) - 1)
+
+     Returns:
+         list: the elements of the requested ranks, in the order of `ranks`
+     """
+     high = len(A) - 1 if high is None else high
+     ranks = list(ranks)
+     wanted = sorted(set(ranks))
+     if wanted and not (low <= wanted[0] and wanted[-1] <= high):
+          raise IndexError(f"ranks {ranks} are not all inside of A[{low}..{high}]")
+     # every entry: a range of A, the slice wanted[a:b] of the ranks in it,
+     # and the stall count of introselect
+     stack = [(low, high, 0, len(wanted), 0)] if wanted else []
+     while stack:
+          low, high, a, b, stalls = stack.pop()
+          if b - a == 1:
+               introselect(A, wanted[a], low, high)
+               continue
+          if high - low < INTROSELECT_CUTOFF:
+               A[low:high + 1] = sorted(A[low:high + 1])
+               continue
+          size = high - low + 1
+          if stalls >= INTROSELECT_STALLS:
+               pivot = median_of_medians(A, low, high)
+               stalls = 0
+          else:
+               pivot = median_of_three(A, low, high)
+          lt, gt = partition3(A, low, high, pivot)
+          # ranks in [lt, gt] are already answered by the block equal to the pivot
+          left = bisect_left(wanted, lt, a, b)
+          right = bisect_right(wanted, gt, left, b)
+          if left > a:
+               stack.append((low, lt - 1, a, left, stalls + 1 if 4 * (lt - low) > 3 * size else 0))
+          if b > right:
+               stack.append((gt + 1, high, right, b, stalls + 1 if 4 * (high - gt) > 3 * size else 0))
+     return [A[k] for k in ranks]
+
+def quantiles(A : list, qs) -> list:
+     """nearest-rank quantiles of A, e.g. quantiles(latencies, (0.5, 0.9, 0.99, 0.999))
+     for p50, p90, p99 and p999, found with one select_many call (A is rearranged)
+
+     Args:
+         A (Array/List): The intended array, not empty
+         qs (iterable): quantiles between 0 and 1
+
+     Returns:
+         list: for every q, the smallest element with at least q·len(A)
+             elements not larger than it (the q = 0 quantile is the minimum)
+     """
+     if not A:
+          raise ValueError("quantiles of an empty list")
+     ranks = []
+     for q in qs:
+          if not 0 <= q <= 1:
+               raise ValueError(f"quantile {q} is not between 0 and 1")
+          ranks.append(max(1, math.ceil(q * len(A))) - 1)
+     return select_many(A, ranks)
+
+def benchmark_quantiles(n=10**6, qs=(0.5, 0.9, 0.99, 0.999), trials=3):
+     """Compares quantiles() with one introselect call per quantile and with
+     a full sort, on n random floats."""
+     A = [random.random() for _ in range(n)]
+     ranks = [max(1, math.ceil(q * n)) - 1 for q in qs]
+     def separately(B):
+          return [introselect(B, k) for k in ranks]
+     def full_sort(B):
+          B.sort()
+          return [B[k] for k in ranks]
+     methods = {"quantiles": lambda B: quantiles(B, qs), "introselect per q": separately,
+                "sort": full_sort, "single introselect": lambda B: introselect(B, ranks[0])}
+     results = {}
+     for name, method in methods.items():
+          best = float("inf")
+          for _ in range(trials):
+               B = A.copy()
+               start_time = time.perf_counter()
+               method(B)
+               best = min(best, time.perf_counter() - start_time)
+          results[name] = best
+          print(f"{name:<20} {best:.4f} s")
+     return results
+
+
+if __name__ == "__main__":
+     b = [1 , 5, 46, 7 , 4 , 6 , 12 , 0 , 4 , 2]
+     print(randomized_Select(b , 0 , (len(b) - 1) , 6 ))
+     b = [1 , 5, 46, 7 , 4 , 6 , 12 , 0 , 4 , 2]
+     print(introselect(b , 5))
+     print(quantiles(b , (0.5 , 0.9 , 0.99)))
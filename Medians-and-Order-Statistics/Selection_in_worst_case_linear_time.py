@@ -1,53 +1,121 @@
+import random
+import time
+
+# Ranges of at most this many elements are sorted directly
+SELECT_CUTOFF = 25
+
 def SELECT(A, p, r, i):
      """The selection algorithm presented in this section achieves
 linear time in the worst case, but it is not nearly as practical as
 RANDOMIZED-SELECT. It is mostly of theoretical interest.
+
+     Args:
+         A (Array/List): The intended array
+         p (int): first index of the range
+         r (int): last index of the range
+         i (int): ith order statistic (1-based) of A[p..r]
+
+     Returns:
+         the ith minimum number of A[p..r]
      """
-     
-     # Step 1: Ensure (r - p + 1) is divisible by 5
-     while (r - p + 1) % 5 != 0:
-         for j in range(p + 1, r + 1):
-             if A[p] > A[j]:
-                 A[p], A[j] = A[j], A[p]  # Swap A[p] with A[j]
-         if i == 1:
-             return A[p]  # Return the minimum of A[p:r+1]
-         p += 1
-         i -= 1
- 
-     # Step 2: Group elements into groups of 5 and sort each group
-     g = (r - p + 1) // 5  # Number of 5-element groups
-     for j in range(g):
-         start = p + j * 5
-         group = A[start:start + 5]
-         group.sort()
-         A[start:start + 5] = group
- 
-     # Step 3: Find the median of medians
-     medians_start = p + 2
-     medians_end = p + 2 + g - 1
-     median_of_medians_index = (g + 1) // 2
-     x = SELECT(A, medians_start, medians_end, median_of_medians_index)
- 
-     # Step 4: Partition around the pivot (x)
-     q = PARTITION_AROUND(A, p, r, x)
- 
-     # Step 5: Recursive selection based on partition result
-     k = q - p + 1
-     if i == k:
-         return A[q]  # The pivot value is the answer
-     elif i < k:
-         return SELECT(A, p, q - 1, i)
-     else:
-         return SELECT(A, q + 1, r, i - k)
-
-def PARTITION_AROUND(A, p, r, pivot):
-     """Partitions the array around the given pivot value."""
-     pivot_index = A.index(pivot)
-     A[pivot_index], A[r] = A[r], A[pivot_index]  # Move pivot to the end
-     i = p - 1
-     for j in range(p, r):
-         if A[j] <= pivot:
-             i += 1
-             A[i], A[j] = A[j], A[i]
-     A[i + 1], A[r] = A[r], A[i + 1]  # Place pivot in its final position
-     return i + 1
+     return A[SELECT_INDEX(A, p, r, i)]
+
+def SELECT_INDEX(A, p, r, i):
+     """SELECT that returns the index of the answer instead of its value.
+     A is rearranged so that the answer ends up at A[p + i - 1], with the
+     elements before it not larger and the elements after it not smaller.
+     Only the median-of-medians step recurses (on a fifth of the range); the
+     descent into one side of the partition is a loop.
+     """
+     if not 1 <= i <= r - p + 1:
+          raise IndexError(f"order statistic {i} is outside of A[{p}..{r}]")
+     while True:
+          if r - p + 1 <= SELECT_CUTOFF:
+               A[p:r + 1] = sorted(A[p:r + 1])
+               return p + i - 1
+
+          # Step 1: Ensure (r - p + 1) is divisible by 5
+          while (r - p + 1) % 5 != 0:
+               m = p
+               for j in range(p + 1, r + 1):
+                    if A[j] < A[m]:
+                         m = j
+               A[p], A[m] = A[m], A[p]  # Move the minimum of A[p:r+1] to A[p]
+               if i == 1:
+                    return p
+               p += 1
+               i -= 1
+
+          # Step 2: Sort each group of 5 and move its median to the front,
+          # so that the g medians are contiguous in A[p:p+g]
+          g = (r - p + 1) // 5  # Number of 5-element groups
+          for j in range(g):
+               start = p + j * 5
+               A[start:start + 5] = sorted(A[start:start + 5])
+               A[p + j], A[start + 2] = A[start + 2], A[p + j]
+
+          # Step 3: Find the median of medians
+          x = SELECT_INDEX(A, p, p + g - 1, (g + 1) // 2)
+
+          # Step 4: Partition around the pivot (A[x])
+          q, t = PARTITION_AROUND(A, p, r, x)
+
+          # Step 5: Continue in the part that holds the answer
+          if i < q - p + 1:
+               r = q - 1
+          elif i > t - p + 1:
+               i -= t - p + 1
+               p = t + 1
+          else:
+               return p + i - 1  # inside the block equal to the pivot
+
+def PARTITION_AROUND(A, p, r, x):
+     """Partitions A[p..r] around the pivot A[x] (p <= x <= r).
+
+     Returns:
+         tuple: (q, t) such that A[q..t] are the elements equal to the pivot,
+             with the smaller ones before them and the larger ones after.
+             Grouping the equal elements keeps the split balanced when the
+             array has duplicates.
+     """
+     pivot = A[x]
+     q = p
+     for j in range(p, r + 1):
+          if A[j] < pivot:
+               A[q], A[j] = A[j], A[q]
+               q += 1
+     t = q
+     for j in range(q, r + 1):
+          if not pivot < A[j]:
+               A[t], A[j] = A[j], A[t]
+               t += 1
+     return q, t - 1
+
+def benchmark_select(sizes=(10**4, 10**5, 10**6), trials=3):
+     """Times SELECT of the median on random floats, sorted and all-equal
+     input and prints the time per element, which stays flat if the running
+     time is linear."""
+     inputs = {
+          "random": lambda n: [random.random() for _ in range(n)],
+          "sorted": lambda n: list(range(n)),
+          "equal": lambda n: [0] * n,
+     }
+     results = {}
+     for name, make in inputs.items():
+          for n in sizes:
+               A = make(n)
+               best = float("inf")
+               for _ in range(trials):
+                    B = A.copy()
+                    start_time = time.perf_counter()
+                    SELECT(B, 0, n - 1, (n + 1) // 2)
+                    best = min(best, time.perf_counter() - start_time)
+               results[(name, n)] = best
+               print(f"{name:<8} n={n:<9} {best:.4f} s  {best / n * 1e9:.0f} ns/element")
+     return results
+
+
+if __name__ == "__main__":
+     b = [1 , 5, 46, 7 , 4 , 6 , 12 , 0 , 4 , 2]
+     print(SELECT(b , 0 , len(b) - 1 , 6))
+     benchmark_select()
@@ -0,0 +1,196 @@
+import math
+from collections import deque
+from heapq import heapify, heappop, heappush
+
+# Order statistics of the last `window` samples of a stream, with two heaps:
+# `low` (a max-heap, stored negated) holds the rank + 1 smallest samples of the
+# window and `high` (a min-heap) the rest, so the wanted sample is the top of
+# `low`. A sample that leaves the window is not searched for; it is counted in
+# the `delayed` dict of its heap and popped once it reaches the top (lazy
+# deletion). A heap that is more than half dead entries is rebuilt.
+# Time complexity: O(log n) amortized per sample, O(1) per query
+# Memory Order: O(n) for a window of n samples
+
+# push_many rebuilds the heaps (one sort of the window) for batches of at least
+# window / REBUILD_FRACTION samples; one sort costs about as much as pushing
+# a tenth of the window
+REBUILD_FRACTION = 10
+
+
+class SlidingWindowOrderStatistic:
+     """
+     The k-th smallest (0-based) or the q-quantile (nearest rank, like
+     quantiles() of the selection module) of the last `window` numbers pushed.
+
+     Example:
+          p90 = SlidingWindowOrderStatistic(1000, q=0.9)
+          for latency in stream:
+               p90.push(latency)
+               alert_if_slow(p90.value())
+     """
+
+     def __init__(self, window, k=None, q=None):
+          if window < 1:
+               raise ValueError("window must be at least 1.")
+          if (k is None) == (q is None):
+               raise ValueError("pass exactly one of k and q.")
+          if k is not None and not 0 <= k < window:
+               raise ValueError(f"k {k} is not a rank of a window of {window}")
+          if q is not None and not 0 <= q <= 1:
+               raise ValueError(f"quantile {q} is not between 0 and 1")
+          self.window = window
+          self.k = k
+          self.q = q
+          self.samples = deque()
+          self.low = []  # negated
+          self.high = []
+          self.low_size = 0  # live entries of each heap
+          self.high_size = 0
+          self.low_delayed = {}
+          self.high_delayed = {}
+
+     def __len__(self):
+          """Number of samples in the window."""
+          return len(self.samples)
+
+     def rank(self):
+          """Rank (0-based) of the wanted sample among the current samples."""
+          n = len(self.samples)
+          if self.k is not None:
+               return min(self.k, n - 1)
+          return max(1, math.ceil(self.q * n)) - 1
+
+     def value(self):
+          """The wanted order statistic of the window."""
+          if not self.samples:
+               raise ValueError("the window is empty")
+          if self.k is not None and len(self.samples) <= self.k:
+               raise IndexError(f"rank {self.k} needs more than {len(self.samples)} samples")
+          return -self.low[0]
+
+     def push(self, x):
+          """Adds a sample, dropping the oldest one if the window is full."""
+          if len(self.samples) == self.window:
+               self.remove(self.samples.popleft())
+          self.samples.append(x)
+          if self.low_size and x <= -self.low[0]:
+               heappush(self.low, -x)
+               self.low_size += 1
+          else:
+               heappush(self.high, x)
+               self.high_size += 1
+          self.rebalance()
+
+     def push_many(self, values):
+          """Adds a batch of samples. Once the batch is at least
+          window / REBUILD_FRACTION samples long, the heaps are rebuilt from
+          the new window with one sort instead of pushed one by one (samples
+          that would leave the window within the batch are skipped)."""
+          values = list(values)
+          if len(values) * REBUILD_FRACTION < self.window:
+               for x in values:
+                    self.push(x)
+               return self
+          kept = values[-self.window:]
+          if len(kept) < self.window:
+               kept = list(self.samples)[max(0, len(self.samples) + len(kept) - self.window):] + kept
+          self.samples = deque(kept)
+          ordered = sorted(kept)
+          split = self.rank() + 1
+          self.low = [-x for x in ordered[split - 1::-1]]  # descending, so a valid heap
+          self.high = ordered[split:]
+          self.low_size = split
+          self.high_size = len(self.high)
+          self.low_delayed = {}
+          self.high_delayed = {}
+          return self
+
+     def remove(self, x):
+          """Marks a sample of the window as deleted. If it equals the top of
+          `low`, `low` holds a copy of it, so a copy is deleted there."""
+          if x <= -self.low[0]:
+               self.low_delayed[x] = self.low_delayed.get(x, 0) + 1
+               self.low_size -= 1
+               if len(self.low) > 2 * self.low_size + 16:
+                    self.low = self.purge(self.low, self.low_delayed, -1)
+          else:
+               self.high_delayed[x] = self.high_delayed.get(x, 0) + 1
+               self.high_size -= 1
+               if len(self.high) > 2 * self.high_size + 16:
+                    self.high = self.purge(self.high, self.high_delayed, 1)
+          self.prune()
+
+     def purge(self, heap, delayed, sign):
+          """Rebuilds a heap without its deleted entries."""
+          live = []
+          for entry in heap:
+               x = sign * entry
+               if delayed.get(x):
+                    delayed[x] -= 1
+               else:
+                    live.append(entry)
+          delayed.clear()
+          heapify(live)
+          return live
+
+     def prune(self):
+          """Pops deleted entries from the tops of both heaps."""
+          low, delayed = self.low, self.low_delayed
+          while low and delayed.get(-low[0]):
+               delayed[-low[0]] -= 1
+               heappop(low)
+          high, delayed = self.high, self.high_delayed
+          while high and delayed.get(high[0]):
+               delayed[high[0]] -= 1
+               heappop(high)
+
+     def rebalance(self):
+          """Moves tops between the heaps until `low` holds rank() + 1 samples."""
+          target = self.rank() + 1
+          while self.low_size > target:
+               heappush(self.high, -heappop(self.low))
+               self.low_size -= 1
+               self.high_size += 1
+               self.prune()
+          while self.low_size < target and self.high_size:
+               heappush(self.low, -heappop(self.high))
+               self.high_size -= 1
+               self.low_size += 1
+               self.prune()
+
+
+class SlidingWindowMedian(SlidingWindowOrderStatistic):
+     """
+     Median of the last `window` numbers pushed; for an even number of
+     samples, the mean of the two middle ones.
+
+     Example:
+          m = SlidingWindowMedian(100)
+          m.push_many(first_batch)
+          m.median()
+     """
+
+     def __init__(self, window):
+          super().__init__(window, q=0.5)
+
+     def median(self):
+          lower = self.value()
+          if len(self.samples) % 2:
+               return lower
+          return (lower + self.high[0]) / 2
+
+
+def rolling_median(values, window):
+     """Median of every window of `window` consecutive values, after each
+     value from the first one on (so the first window - 1 medians are of
+     shorter prefixes)."""
+     m = SlidingWindowMedian(window)
+     medians = []
+     for x in values:
+          m.push(x)
+          medians.append(m.median())
+     return medians
+
+
+if __name__ == "__main__":
+     print(rolling_median([1, 3, -1, -3, 5, 3, 6, 7], 3))
@@ -1,9 +1,50 @@
+import json
+import logging
+import multiprocessing
 import random
+import statistics
 import time
+import tracemalloc
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+from math import isqrt
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for backend="numpy"
+    np = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows, only used by peak_rss_growth
+    resource = None
 
 def swap(A, i, j):
     A[i], A[j] = A[j], A[i]
 
+# key= / reverse= support (decorate-sort-undecorate)
+# key(x) is evaluated exactly once per element. The decorated entries are
+# (key, index) tuples, so ties are broken by the original position and the
+# elements themselves are never compared: every comparison sort becomes stable
+# when called with key= or reverse=. For reverse=True the index is negated and
+# the ascending result is reversed, so equal keys still keep their input order.
+def keyed_order(sort_func, items, key=None, reverse=False):
+    """Returns a new list with `items` ordered by key, using sort_func (which
+    sorts a list ascending, in place or by returning it) on the decorated list."""
+    sign = -1 if reverse else 1
+    if key is None:
+        decorated = [(x, sign * i) for i, x in enumerate(items)]
+    else:
+        decorated = [(key(x), sign * i) for i, x in enumerate(items)]
+    result = sort_func(decorated)
+    if result is not None:
+        decorated = result
+    if reverse:
+        decorated.reverse()
+    return [items[sign * i] for _, i in decorated]
+
 def partition(A, low, high):
     all_equal = True
     first_element = A[low]
@@ -22,6 +63,101 @@ def partition(A, low, high):
     swap(A, high, i + 1)
     return i + 1
 
+# Sorting networks for tiny ranges
+# A sorting network is a fixed sequence of compare-exchange operations, so a
+# range of 2..16 elements can be sorted by straight-line code with no loops or
+# index bookkeeping. The comparators come from Batcher's odd-even merge sort,
+# generated for every size (comparators touching positions >= n are dropped,
+# which is valid since those positions would hold +infinity). For n <= 8 they
+# use the optimal number of comparators, for n = 16 they use 63 (optimum: 60).
+NETWORK_MAX = 16
+
+def batcher_network(n):
+    """Returns the comparators (i, j), i < j, of Batcher's odd-even merge
+    sorting network for n inputs."""
+    pairs = []
+    p = 1
+    while p < n:
+        k = p
+        while k >= 1:
+            for j in range(k % p, n - k, 2 * k):
+                for i in range(min(k, n - j - k)):
+                    if (i + j) // (2 * p) == (i + j + k) // (2 * p):
+                        pairs.append((i + j, i + j + k))
+            k //= 2
+        p *= 2
+    return pairs
+
+def network_kernel(n):
+    """Compiles the sorting network for n elements into a function
+    sort_n(A, low) that sorts A[low..low + n - 1] in place with local variables."""
+    names = [f"a{i}" for i in range(n)]
+    lines = [f"def sort_{n}(A, low):"]
+    lines += [f"    {name} = A[low + {i}]" for i, name in enumerate(names)]
+    lines += [f"    if a{j} < a{i}: a{i}, a{j} = a{j}, a{i}" for i, j in batcher_network(n)]
+    lines += [f"    A[low + {i}] = {name}" for i, name in enumerate(names)]
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace[f"sort_{n}"]
+
+NETWORK_KERNELS = {n: network_kernel(n) for n in range(2, NETWORK_MAX + 1)}
+
+# Networks are not stable, so the stable sorts only use them on elements whose
+# equal values are indistinguishable
+NETWORK_STABLE_TYPES = (int, str)
+
+def network_sort(A, low, high):
+    """Sorts A[low..high] (at most NETWORK_MAX elements) with a sorting network.
+    Not stable."""
+    n = high - low + 1
+    if n > 1:
+        NETWORK_KERNELS[n](A, low)
+
+def network_sort_rows(X):
+    """
+    Sorts every row of a 2-D NumPy array in place with the sorting network
+    for its width (at most NETWORK_MAX columns). Each comparator is applied to
+    a whole pair of columns at once, so millions of short rows (e.g. 8-element
+    feature vectors) are sorted in len(network) vectorized steps. Rows holding
+    NaN are not sorted correctly (np.minimum/np.maximum propagate it).
+
+    Returns:
+        numpy.ndarray: X.
+    """
+    if np is None:
+        raise ImportError("network_sort_rows requires NumPy to be installed.")
+    if X.ndim != 2 or X.shape[1] > NETWORK_MAX:
+        raise ValueError(f"X must be a 2-D array with at most {NETWORK_MAX} columns.")
+    # work on the transpose so that every column is one contiguous vector
+    columns = np.ascontiguousarray(X.T)
+    low = np.empty_like(columns[0])
+    for i, j in batcher_network(X.shape[1]):
+        np.minimum(columns[i], columns[j], out=low)
+        np.maximum(columns[i], columns[j], out=columns[j])
+        columns[i] = low
+    X[...] = columns.T
+    return X
+
+# Three-way (Dutch national flag) partition
+# Splits A[low..high] into < pivot, == pivot and > pivot blocks and returns
+# (lt, gt) such that A[lt..gt] holds every key equal to the pivot, so duplicate
+# heavy inputs don't need the all-equal scan or repeated passes over equal keys
+def partition3(A, low, high):
+    pivot = A[high]
+    lt = i = low
+    gt = high
+    while i <= gt:
+        if A[i] < pivot:
+            swap(A, lt, i)
+            lt += 1
+            i += 1
+        elif A[i] > pivot:
+            swap(A, i, gt)
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
+
 def randomized_partition(A, low, high):
     i = random.randint(low, high)
     swap(A, i, high)
@@ -36,7 +172,7 @@ def randomized_partition(A, low, high):
 # The average running time of quicksort is O(nlgn) because even if the 
 # partition function, splits the n elements into a 9n/10 and n/10 sections
 # solving the recurrence relation shows that the time complexity would be O(nlgn)
-def quicksort(A : list, p : int, r : int ) -> list:
+def quicksort(A : list, p : int, r : int, three_way : bool = False, key=None, reverse : bool = False) -> list:
     """The quicksort algorithm has a worst-case running time of Θ(n^2) on an
 input Aay of n numbers. Despite this slow worst-case running time,
 quicksort is often the best practical choice for sorting because it is
@@ -44,8 +180,23 @@ remarkably efficient on average: its expected running time is Θ(n lg n)
 when all numbers are distinct, and the constant factors hidden in the
 Θ(n lg n) notation are small. Unlike merge sort, it also has the
 advantage of sorting in place , and it works well even in
-virtual-memory environments"""
-    if p < r:
+virtual-memory environments.
+
+With three_way=True the range is split with `partition3` and the block of
+keys equal to the pivot is never visited again, which keeps inputs with few
+distinct keys close to Θ(n lg k) for k distinct values.
+
+Not stable, unless key= or reverse= is given (see `keyed_order`)."""
+    if key is not None or reverse:
+        A[p:r + 1] = keyed_order(lambda D: quicksort(D, 0, len(D) - 1, three_way), A[p:r + 1], key, reverse)
+        return
+    if r - p + 1 <= NETWORK_MAX:
+        network_sort(A, p, r)
+    elif three_way:
+        lt, gt = partition3(A, p, r)
+        quicksort(A, p, lt - 1, True)
+        quicksort(A, gt + 1, r, True)
+    else:
         q = partition(A, p, r)
         quicksort(A, p, q - 1)
         quicksort(A, q + 1, r)
@@ -56,16 +207,27 @@ def randomized_quicksort(A, p, r):
         randomized_quicksort(A, p, q - 1)
         randomized_quicksort(A, q + 1, r)
         
-def insertion_sort(A : list) -> list:
-    for i in range(1, len(A)):
+def insertion_sort(A : list, low : int = 0, high : int = None, key=None, reverse : bool = False) -> list:
+    if high is None:
+        high = len(A) - 1
+    if key is not None or reverse:
+        A[low:high + 1] = keyed_order(insertion_sort, A[low:high + 1], key, reverse)
+        return
+    for i in range(low + 1, high + 1):
         key = A[i]
         j = i - 1
-        while j >= 0 and A[j] > key:
+        while j >= low and A[j] > key:
             A[j + 1] = A[j]
             j -= 1
         A[j + 1] = key
         
-def merge_sort(A : list) -> list:
+def merge_sort(A : list, key=None, reverse : bool = False) -> list:
+    if key is not None or reverse:
+        return keyed_order(merge_sort, A, key, reverse)
+    if 1 < len(A) <= NETWORK_MAX and all(type(x) in NETWORK_STABLE_TYPES for x in A):
+        A = A.copy()
+        network_sort(A, 0, len(A) - 1)
+        return A
     if len(A) > 1:
         mid = len(A) // 2
         left = merge_sort(A[:mid])
@@ -87,6 +249,417 @@ def merge(left, right):
     result.extend(right[j:])
     return result
 
+# Bottom-up merge sort
+
+# Merges runs of width 1, 2, 4, ... in place. The only allocation is one
+# auxiliary buffer created up front, every merge copies its left run into it
+# and merges back into A.
+# Memory Order: Θ(n) for the buffer, allocated exactly once
+# Time complexity: O(nlgn), O(n) on already sorted input since merges of
+# ordered runs (A[mid - 1] <= A[mid]) are skipped
+MIN_GALLOP = 7
+
+def merge_runs(A, buf, low, mid, high):
+    """Merges the sorted runs A[low..mid-1] and A[mid..high] in place, using
+    buf as scratch space for the left run.
+
+    After MIN_GALLOP consecutive picks from the same run, the rest of the
+    winning streak is located with a binary search and copied as a block."""
+    n1 = mid - low
+    for t in range(n1):
+        buf[t] = A[low + t]
+    i, j, k = 0, mid, low
+    left_wins = right_wins = 0
+    while i < n1 and j <= high:
+        if A[j] < buf[i]:
+            A[k] = A[j]
+            k += 1
+            j += 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= MIN_GALLOP:
+                end = bisect_left(A, buf[i], j, high + 1)
+                while j < end:
+                    A[k] = A[j]
+                    k += 1
+                    j += 1
+                right_wins = 0
+        else:
+            A[k] = buf[i]
+            k += 1
+            i += 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= MIN_GALLOP and j <= high:
+                end = bisect_right(buf, A[j], i, n1)
+                while i < end:
+                    A[k] = buf[i]
+                    k += 1
+                    i += 1
+                left_wins = 0
+    # whatever is left of the right run is already in place
+    while i < n1:
+        A[k] = buf[i]
+        k += 1
+        i += 1
+
+def merge_sort_buffered(A : list) -> list:
+    """
+    Sorts a list in place using an iterative (bottom-up) merge sort with a
+    single reusable buffer. The result is stable and matches `merge_sort`.
+
+    Args:
+        A (list): The list to be sorted.
+
+    Returns:
+        list: The sorted list.
+    """
+    n = len(A)
+    buf = [None] * n
+    width = 1
+    while width < n:
+        for low in range(0, n - width, 2 * width):
+            mid = low + width
+            high = min(low + 2 * width, n) - 1
+            if A[mid - 1] > A[mid]:
+                merge_runs(A, buf, low, mid, high)
+        width *= 2
+    return A
+
+# Block merge sort (in-place stable merging, in the style of WikiSort)
+
+# Bottom-up merge sort whose merges need no buffer. To merge the sorted runs
+# A and B, about 2*sqrt(|A|) distinct values are pulled out of A into an
+# internal buffer. One half tags the sqrt(|A|)-sized blocks of A so that they
+# can be moved around and still be told apart; the other half is swap space
+# for merging one A block at a time. The A blocks are rolled through B, each
+# one is dropped where it belongs and merged with the B values in front of it,
+# and finally the buffer is sorted and its values are put back in place.
+# With too few distinct values there is no swap space; the values found are
+# used as tags only and the blocks are merged by rotations, which stays cheap
+# because A then consists of few runs of equal values.
+# Time complexity: O(nlgn)
+# Memory Order: O(1)
+BLOCK_MERGE_RUN = 16
+# rotations of at most this many elements are done with slices (bounded,
+# constant-size temporaries), longer ones with in-place reversals
+ROTATE_SLICE_LIMIT = 64
+
+def reverse_range(A, low, high):
+    """Reverses A[low:high] in place."""
+    high -= 1
+    while low < high:
+        A[low], A[high] = A[high], A[low]
+        low += 1
+        high -= 1
+
+def rotate(A, low, mid, high):
+    """Rotates A[low:high] in place so that A[mid:high] comes first."""
+    if low == mid or mid == high:
+        return
+    if high - low <= ROTATE_SLICE_LIMIT:
+        A[low:high] = A[mid:high] + A[low:mid]
+        return
+    reverse_range(A, low, mid)
+    reverse_range(A, mid, high)
+    reverse_range(A, low, high)
+
+def block_swap(A, i, j, size):
+    """Swaps the non-overlapping ranges A[i:i+size] and A[j:j+size]."""
+    for k in range(size):
+        A[i + k], A[j + k] = A[j + k], A[i + k]
+
+def merge_in_place(A, a0, a1, b1):
+    """Merges the sorted runs A[a0:a1] and A[a1:b1] with rotations. Every
+    rotation moves at least one value of B and skips at least one distinct
+    value of A, so this is cheap when either run is short or A has few
+    distinct values."""
+    while a0 < a1 < b1:
+        # values of A that are <= the first value of B are already in place
+        a0 = bisect_right(A, A[a1], a0, a1)
+        if a0 == a1:
+            return
+        # the values of B smaller than A[a0] go in front of the rest of A
+        mid = bisect_left(A, A[a0], a1, b1)
+        rotate(A, a0, a1, mid)
+        a0 += mid - a1
+        a1 = mid
+
+def merge_internal(A, a0, a1, b1, buf):
+    """Merges the sorted runs A[a0:a1] and A[a1:b1] using A[buf:buf+(a1-a0)]
+    as swap space. The values of the swap space are preserved but permuted."""
+    n = a1 - a0
+    block_swap(A, a0, buf, n)
+    i, j, k = buf, a1, a0
+    end = buf + n
+    while i < end and j < b1:
+        if A[j] < A[i]:
+            A[k], A[j] = A[j], A[k]
+            j += 1
+        else:
+            A[k], A[i] = A[i], A[k]
+            i += 1
+        k += 1
+    block_swap(A, k, i, end - i)
+
+def extract_buffer(A, low, high, want):
+    """Moves the first occurrences of up to `want` distinct values of the
+    sorted run A[low:high] to its front, keeping the rest in order.
+
+    Returns:
+        int: Number of values moved (the buffer is A[low:low+count])."""
+    count = 1
+    b = low  # the buffer A[b:b+count] is moved along to the next new value
+    while count < want:
+        i = bisect_right(A, A[b + count - 1], b + count, high)
+        if i == high:
+            break
+        rotate(A, b, b + count, i)
+        b = i - count
+        count += 1
+    rotate(A, low, b, b + count)
+    return count
+
+def redistribute_buffer(A, low, count, high):
+    """Inserts the sorted, distinct buffer A[low:low+count] into the sorted
+    run A[low+count:high], each value in front of the values equal to it."""
+    while count:
+        pos = bisect_left(A, A[low], low + count, high)
+        rotate(A, low, low + count, pos)
+        # the smallest buffer value is now at pos - count, in its place
+        low = pos - count + 1
+        count -= 1
+
+def block_roll(A, a0, a1, b1, block_size, tags, buf):
+    """Merges the sorted runs A[a0:a1] and A[a1:b1] by rolling the A blocks
+    through B. A[tags:...] holds one distinct, ascending tag per A block and
+    A[buf:buf+block_size] is swap space (None: merge by rotations)."""
+    first = (a1 - a0) % block_size
+    t = tags
+    for block in range(a0 + first, a1, block_size):
+        A[block], A[t] = A[t], A[block]  # the tag stands in for the block's first value
+        t += 1
+
+    last_a0, last_a1 = a0, a0 + first  # previous A block, merged when the next one is dropped
+    last_b0 = last_b1 = last_a1  # B block directly in front of the rolling A blocks
+    block_a0, block_a1 = last_a1, a1  # the A blocks still to be dropped
+    block_b0, block_b1 = a1, min(a1 + block_size, b1)
+    min_a = block_a0  # the A block with the smallest tag
+    index_a = tags  # where the first value of that block is kept
+    while block_a0 < block_a1:
+        if (last_b1 > last_b0 and not A[last_b1 - 1] < A[index_a]) or block_b0 == block_b1:
+            # the smallest A block belongs inside (or before) the previous
+            # B block: drop it there
+            b_split = bisect_left(A, A[index_a], last_b0, last_b1)
+            b_remaining = last_b1 - b_split
+            if min_a != block_a0:
+                block_swap(A, block_a0, min_a, block_size)
+            A[block_a0], A[index_a] = A[index_a], A[block_a0]
+            index_a += 1
+            # merge the previous A block with the B values up to the split
+            if buf is None:
+                merge_in_place(A, last_a0, last_a1, b_split)
+            else:
+                merge_internal(A, last_a0, last_a1, b_split, buf)
+            rotate(A, b_split, block_a0, block_a0 + block_size)
+            last_a0 = block_a0 - b_remaining
+            last_a1 = last_a0 + block_size
+            last_b0, last_b1 = last_a1, last_a1 + b_remaining
+            block_a0 += block_size
+            min_a = block_a0
+            for block in range(block_a0 + block_size, block_a1, block_size):
+                if A[block] < A[min_a]:
+                    min_a = block
+        elif block_b1 - block_b0 < block_size:
+            # the last, shorter B block moves in front of the A blocks
+            size = block_b1 - block_b0
+            rotate(A, block_a0, block_b0, block_b1)
+            last_b0, last_b1 = block_a0, block_a0 + size
+            block_a0 += size
+            block_a1 += size
+            min_a += size
+            block_b0 = block_b1
+        else:
+            # roll the leftmost A block behind the next B block
+            block_swap(A, block_a0, block_b0, block_size)
+            last_b0, last_b1 = block_a0, block_a0 + block_size
+            if min_a == block_a0:
+                min_a = block_a1
+            block_a0 += block_size
+            block_a1 += block_size
+            block_b0 += block_size
+            block_b1 = min(block_b1 + block_size, b1)
+
+    if buf is None:
+        merge_in_place(A, last_a0, last_a1, b1)
+    else:
+        merge_internal(A, last_a0, last_a1, b1, buf)
+
+def block_merge(A, low, mid, high):
+    """Stably merges the sorted runs A[low:mid] and A[mid:high] in place."""
+    if not A[mid] < A[mid - 1]:
+        return  # already in order
+    if A[high - 1] < A[low]:
+        rotate(A, low, mid, high)  # B entirely before A
+        return
+    # leave out the values that are already in their final place
+    low = bisect_right(A, A[mid], low, mid)
+    high = bisect_left(A, A[mid - 1], mid, high)
+    m, n = mid - low, high - mid
+    if min(m, n) <= BLOCK_MERGE_RUN:
+        merge_in_place(A, low, mid, high)
+        return
+
+    block_size = isqrt(m)
+    want = m // block_size + block_size
+    count = extract_buffer(A, low, mid, want)
+    if count == want:
+        tags, buf = low, low + want - block_size
+    else:
+        # not enough distinct values for swap space: tags only, with blocks
+        # large enough that `count` tags suffice
+        tags, buf = low, None
+        block_size = (m - count) // count + 1
+    block_roll(A, low + count, mid, high, block_size, tags, buf)
+    insertion_sort(A, low, low + count - 1)
+    redistribute_buffer(A, low, count, high)
+
+def block_merge_sort(A : list, low : int = 0, high : int = None) -> list:
+    """
+    Sorts a list (or A[low..high]) in place with a stable block merge sort
+    that uses O(1) extra memory: runs of BLOCK_MERGE_RUN elements are sorted
+    with insertion sort and then merged bottom-up with `block_merge`.
+
+    Args:
+        A (list): The list to be sorted.
+        low (int): First index of the range to sort.
+        high (int, optional): Last index of the range, defaults to len(A) - 1.
+
+    Returns:
+        list: The sorted list.
+    """
+    if high is None:
+        high = len(A) - 1
+    end = high + 1
+    for start in range(low, end, BLOCK_MERGE_RUN):
+        insertion_sort(A, start, min(start + BLOCK_MERGE_RUN, end) - 1)
+    width = BLOCK_MERGE_RUN
+    while width < end - low:
+        for start in range(low, end - width, 2 * width):
+            block_merge(A, start, start + width, min(start + 2 * width, end))
+        width *= 2
+    return A
+
+# Adaptive (natural-run) merge sort, in the style of Timsort
+
+# Splits the input into ascending runs (strictly descending runs are reversed),
+# extends short runs to `minrun` elements with binary insertion sort and merges
+# them through a run stack that keeps the Timsort invariants, so run lengths
+# grow geometrically and merges stay balanced.
+# Time complexity: O(nlgn), O(n) when the input is made of few long runs
+# Memory Order: Θ(n) for the merge buffer (only allocated if a merge is needed)
+MIN_MERGE = 32
+
+def compute_minrun(n):
+    """Returns a minrun in [MIN_MERGE/2, MIN_MERGE] such that n / minrun is
+    a power of two or slightly less than one."""
+    r = 0
+    while n >= MIN_MERGE:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+def count_run(A, low, high):
+    """Returns the length of the run starting at A[low] (not going past
+    A[high]). A strictly descending run is reversed in place first, which
+    keeps the sort stable."""
+    if low == high:
+        return 1
+    run_high = low + 1
+    if A[run_high] < A[low]:
+        while run_high < high and A[run_high + 1] < A[run_high]:
+            run_high += 1
+        A[low:run_high + 1] = A[low:run_high + 1][::-1]
+    else:
+        while run_high < high and A[run_high + 1] >= A[run_high]:
+            run_high += 1
+    return run_high - low + 1
+
+def binary_insertion_sort(A, low, high, start):
+    """Sorts A[low..high] given that A[low..start-1] is already sorted, using
+    a binary search to find each insertion point."""
+    for i in range(start, high + 1):
+        key = A[i]
+        pos = bisect_right(A, key, low, i)
+        A[pos + 1:i + 1] = A[pos:i]
+        A[pos] = key
+
+def adaptive_sort(A : list, key=None, reverse : bool = False) -> list:
+    """
+    Sorts a list in place with a stable natural-run merge sort (Timsort style).
+    Nearly sorted inputs, e.g. appended timestamps, are sorted in close to
+    linear time.
+
+    Args:
+        A (list): The list to be sorted.
+        key (callable, optional): Extracts the comparison key from each element.
+        reverse (bool): Sorts in descending order, keeping equal keys stable.
+
+    Returns:
+        list: The sorted list.
+    """
+    if key is not None or reverse:
+        A[:] = keyed_order(adaptive_sort, A, key, reverse)
+        return A
+
+    n = len(A)
+    if n < 2:
+        return A
+    minrun = compute_minrun(n)
+    runs = []  # stack of (base, length)
+    buf = None
+    low = 0
+    while low < n:
+        run_len = count_run(A, low, n - 1)
+        if run_len < minrun:
+            forced = min(minrun, n - low)
+            binary_insertion_sort(A, low, low + forced - 1, low + run_len)
+            run_len = forced
+        runs.append((low, run_len))
+        low += run_len
+
+        # restore the invariants |Z| > |Y| + |X| and |Y| > |X| on the top runs
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+               (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                if runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif runs[i][1] > runs[i + 1][1]:
+                break
+            if buf is None:
+                buf = [None] * n
+            merge_at(A, buf, runs, i)
+
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        if buf is None:
+            buf = [None] * n
+        merge_at(A, buf, runs, i)
+    return A
+
+def merge_at(A, buf, runs, i):
+    """Merges the adjacent runs runs[i] and runs[i + 1] of the run stack."""
+    base, len1 = runs[i]
+    len2 = runs[i + 1][1]
+    mid = base + len1
+    if A[mid - 1] > A[mid]:
+        merge_runs(A, buf, base, mid, mid + len2 - 1)
+    runs[i] = (base, len1 + len2)
+    del runs[i + 1]
+
 def bubble_sort(A : list) -> list:
     n = len(A)
     for i in range(n):
@@ -103,139 +676,813 @@ def selection_sort(A : list) -> list:
                 min_idx = j
         swap(A, i, min_idx)
 
-def heapify(A, n, i):
+# heap indices are relative to `low`, so the same routines can heapsort a sub-range
+def heapify(A, n, i, low=0):
     largest = i
     left = 2 * i + 1
     right = 2 * i + 2
-    if left < n and A[left] > A[largest]:
+    if left < n and A[low + left] > A[low + largest]:
         largest = left
-    if right < n and A[right] > A[largest]:
+    if right < n and A[low + right] > A[low + largest]:
         largest = right
     if largest != i:
-        swap(A, i, largest)
-        heapify(A, n, largest)
-
-def heapsort(A : list) -> list:
-    n = len(A)
+        swap(A, low + i, low + largest)
+        heapify(A, n, largest, low)
+
+def heapsort(A : list, low : int = 0, high : int = None, key=None, reverse : bool = False) -> list:
+    if high is None:
+        high = len(A) - 1
+    if key is not None or reverse:
+        A[low:high + 1] = keyed_order(heapsort, A[low:high + 1], key, reverse)
+        return
+    n = high - low + 1
     for i in range(n // 2 - 1, -1, -1):
-        heapify(A, n, i)
+        heapify(A, n, i, low)
     for i in range(n - 1, 0, -1):
-        swap(A, 0, i)
-        heapify(A, i, 0)
+        swap(A, low, low + i)
+        heapify(A, i, 0, low)
+
+# Iterative heapsort engine
+# The heap lives in A[low..high] and is addressed with absolute indices: the
+# children of position p are low + 2(p - low) + 1 and the next one. Instead
+# of swapping on every level, the element being sifted is held aside and the
+# larger child moves up into the "hole", one assignment per level.
+
+def sift_down(A, low, p, end):
+    """Iterative, hole-based sift-down of A[p] in the heap A[low..end-1]."""
+    x = A[p]
+    child = 2 * p - low + 1
+    while child < end:
+        if child + 1 < end and A[child + 1] > A[child]:
+            child += 1
+        if not A[child] > x:
+            break
+        A[p] = A[child]
+        p = child
+        child = 2 * p - low + 1
+    A[p] = x
+
+def build_heap(A, low, end):
+    """Floyd's bottom-up heap construction of A[low..end-1] in Θ(n)."""
+    for p in range((low + end) // 2 - 1, low - 1, -1):
+        sift_down(A, low, p, end)
+
+def heapsort_bottom_up(A : list, low : int = 0, high : int = None) -> list:
+    """
+    Sorts a list in place with bottom-up heapsort (Floyd's "sift to the leaf,
+    then up" extraction). After the maximum is moved to the end, the hole at
+    the root follows the larger child down to a leaf with one comparison per
+    level, and the displaced last element is sifted up from there. Since that
+    element almost always belongs near the leaves, this needs about half the
+    comparisons of the classic sift-down, which compares twice per level.
+
+    Args:
+        A (list): The list to be sorted.
+        low (int): First index of the range to sort.
+        high (int, optional): Last index of the range to sort, defaults to len(A) - 1.
+
+    Returns:
+        list: The sorted list.
+    """
+    if high is None:
+        high = len(A) - 1
+    build_heap(A, low, high + 1)
+    for end in range(high, low, -1):
+        x = A[end]
+        A[end] = A[low]
+        # walk the hole from the root down to a leaf along the larger children
+        p = low
+        child = low + 1
+        while child < end:
+            if child + 1 < end and A[child + 1] > A[child]:
+                child += 1
+            A[p] = A[child]
+            p = child
+            child = 2 * p - low + 1
+        # then sift x back up from the leaf
+        while p > low:
+            parent = (p - low - 1) // 2 + low
+            if not A[parent] < x:
+                break
+            A[p] = A[parent]
+            p = parent
+        A[p] = x
+    return A
+
+def heapsort_dary(A : list, d : int = 4, low : int = 0, high : int = None) -> list:
+    """
+    Sorts a list in place with a d-ary max-heap (4 by default). A wider heap
+    is lg(d) times shallower, so each sift-down touches fewer, closer levels
+    at the cost of d - 1 comparisons to find the largest child.
+
+    Args:
+        A (list): The list to be sorted.
+        d (int): Number of children per heap node, at least 2.
+        low (int): First index of the range to sort.
+        high (int, optional): Last index of the range to sort, defaults to len(A) - 1.
+
+    Returns:
+        list: The sorted list.
+    """
+    if d < 2:
+        raise ValueError("A d-ary heap needs d >= 2.")
+    if high is None:
+        high = len(A) - 1
+
+    def sift(p, end):
+        x = A[p]
+        first = d * (p - low) + 1 + low
+        while first < end:
+            child = first
+            for c in range(first + 1, min(first + d, end)):
+                if A[c] > A[child]:
+                    child = c
+            if not A[child] > x:
+                break
+            A[p] = A[child]
+            p = child
+            first = d * (p - low) + 1 + low
+        A[p] = x
+
+    n = high - low + 1
+    for p in range(low + (n - 2) // d, low - 1, -1):
+        sift(p, high + 1)
+    for end in range(high, low, -1):
+        A[low], A[end] = A[end], A[low]
+        sift(low, end)
+    return A
+
+# Partial sort and streaming top-k
+# Only the k best elements are kept in a bounded heap whose root is the worst
+# of them, so each new element costs one comparison, plus O(lg k) if it
+# replaces the root. Time complexity: O(n lg k), Memory Order: O(k)
+
+def partial_sort(A : list, k : int, key=None, reverse : bool = False) -> list:
+    """
+    Rearranges A in place so that A[:k] holds its k smallest elements (k
+    largest with reverse=True) in sorted order. The order of A[k:] is
+    unspecified without key/reverse; with them it keeps the input order.
+
+    Args:
+        A (list): The list to be partially sorted.
+        k (int): Number of elements to select.
+        key (callable, optional): Extracts the comparison key from each element.
+        reverse (bool): Selects the k largest elements, in descending order.
+
+    Returns:
+        list: A.
+    """
+    n = len(A)
+    k = max(0, min(k, n))
+    if k == 0:
+        return A
+    if key is not None or reverse:
+        top = TopK(k, key, largest=reverse)
+        top.update(A)
+        chosen = top.entries()
+        picked = {seq for _, seq, _ in chosen} if not reverse else {-seq for _, seq, _ in chosen}
+        A[:] = [x for _, _, x in chosen] + [x for i, x in enumerate(A) if i not in picked]
+        return A
+
+    # A[0..k-1] becomes a max-heap of the k smallest elements seen so far
+    build_heap(A, 0, k)
+    for i in range(k, n):
+        if A[i] < A[0]:
+            A[0], A[i] = A[i], A[0]
+            sift_down(A, 0, 0, k)
+    for end in range(k - 1, 0, -1):
+        A[0], A[end] = A[end], A[0]
+        sift_down(A, 0, 0, end)
+    return A
+
+class TopK:
+    """
+    Streaming accumulator for the k smallest (or largest) items of an
+    iterable, in O(k) memory.
+
+    Items are stored as (key, seq, item) entries, where seq is the arrival
+    order, so equal keys keep the first items seen and items are never
+    compared themselves. The k smallest are kept in a max-heap (built with
+    `build_heap` / `sift_down` once k items have arrived), the k largest in
+    a heapq min-heap with seq negated.
+
+    Example:
+        slowest = TopK(100, key=lambda r: r.latency, largest=True)
+        slowest.update(requests)
+        slowest.result()
+    """
+
+    def __init__(self, k, key=None, largest=False):
+        if k < 0:
+            raise ValueError("k must be non-negative.")
+        self.k = k
+        self.key = key
+        self.largest = largest
+        self.heap = []
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, item):
+        """Offers one item to the accumulator."""
+        self.push_keyed(item if self.key is None else self.key(item), item)
+
+    def push_keyed(self, item_key, item):
+        seq = self.seq
+        self.seq += 1
+        heap = self.heap
+        if self.largest:
+            entry = (item_key, -seq, item)
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif heap and entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        else:
+            entry = (item_key, seq, item)
+            if len(heap) < self.k:
+                heap.append(entry)
+                if len(heap) == self.k:
+                    build_heap(heap, 0, self.k)
+            elif heap and entry < heap[0]:
+                heap[0] = entry
+                sift_down(heap, 0, 0, self.k)
+
+    def update(self, iterable):
+        """Offers every item of an iterable (list, generator, ...)."""
+        push = self.push
+        for item in iterable:
+            push(item)
+        return self
+
+    def merge(self, other):
+        """Adds the items kept by another TopK, e.g. one filled by another
+        worker. Its keys are reused, not recomputed."""
+        if other.largest != self.largest:
+            raise ValueError("Cannot merge a largest=True TopK with a largest=False one.")
+        for item_key, _, item in other.entries():
+            self.push_keyed(item_key, item)
+        return self
+
+    def entries(self):
+        """The kept (key, seq, item) entries, best first."""
+        entries = heapsort_bottom_up(self.heap.copy())
+        if self.largest:
+            entries.reverse()
+        return entries
+
+    def result(self):
+        """The kept items, best first (ascending, or descending if largest)."""
+        return [item for _, _, item in self.entries()]
+
+# Block partitioning (BlockQuicksort, Edelkamp and Weiß)
+# Instead of swapping as soon as a misplaced element is found, one block of
+# BLOCK_SIZE elements is scanned from each end and the offsets of misplaced
+# elements are recorded without branching (the counter grows by the result of
+# the comparison). The two offset buffers are then swapped pairwise. The scans
+# are tight comparison-only loops and every swap fixes two elements at once.
+# Keys equal to the pivot may go to either side, so all-equal ranges split in
+# the middle without a separate scan.
+BLOCK_SIZE = 64
+
+def block_partition(A, low, high):
+    """Partitions A[low..high] around the pivot A[high] and returns its final
+    index q: A[low..q-1] <= A[q] <= A[q+1..high]."""
+    pivot = A[high]
+    l, r = low, high - 1
+    offsets_l = [0] * BLOCK_SIZE
+    offsets_r = [0] * BLOCK_SIZE
+    num_l = num_r = start_l = start_r = 0
+    while r - l + 1 >= 2 * BLOCK_SIZE:
+        if num_l == 0:
+            start_l = 0
+            for i in range(BLOCK_SIZE):
+                offsets_l[num_l] = i
+                num_l += A[l + i] >= pivot
+        if num_r == 0:
+            start_r = 0
+            for i in range(BLOCK_SIZE):
+                offsets_r[num_r] = i
+                num_r += pivot >= A[r - i]
+        num = min(num_l, num_r)
+        for k in range(num):
+            x = l + offsets_l[start_l + k]
+            y = r - offsets_r[start_r + k]
+            A[x], A[y] = A[y], A[x]
+        num_l -= num
+        num_r -= num
+        start_l += num
+        start_r += num
+        if num_l == 0:
+            l += BLOCK_SIZE
+        if num_r == 0:
+            r -= BLOCK_SIZE
+    # A[low..l-1] <= pivot <= A[r+1..high-1]; finish A[l..r], which also holds
+    # the misplaced elements of a half-used block, with a Hoare scan
+    while True:
+        while l <= r and A[l] < pivot:
+            l += 1
+        while l <= r and A[r] > pivot:
+            r -= 1
+        if l >= r:
+            break
+        A[l], A[r] = A[r], A[l]
+        l += 1
+        r -= 1
+    A[l], A[high] = A[high], A[l]
+    return l
+
+def partition_equal(A, low, high):
+    """Moves the keys equal to A[high], the minimum of A[low..high], to the
+    front of the range and returns the index of the first larger key."""
+    pivot = A[high]
+    i = low
+    for j in range(low, high + 1):
+        if not pivot < A[j]:
+            A[i], A[j] = A[j], A[i]
+            i += 1
+    return i
+
+# Iterative quicksort with an explicit stack
+# After each partition the larger side is pushed and the loop continues on the
+# smaller one. Every range on the stack is then at least as large as the one
+# being worked on, so the stack never holds more than lg(n) ranges, however
+# skewed the partitions are. Ranges of at most NETWORK_MAX elements are
+# finished with a sorting network.
+# Time complexity: O(nlgn) on average, O(n^2) in the worst case
+# Memory Order: O(lgn) stack entries
+def bottom_up_quicksort(A : list, stats : dict = None) -> list:
+    """
+    Sorts a list in place with an iterative, block-partitioning quicksort.
 
-def bottom_up_quicksort(A : list) -> list:
+    Args:
+        A (list): The list to be sorted.
+        stats (dict, optional): If given, receives "max_stack" (the high-water
+            mark of the explicit stack) and "partitions" (number of partition
+            passes).
+
+    Returns:
+        list: The sorted list.
+    """
     stack = [(0, len(A) - 1)]
+    max_stack = 1
+    partitions = 0
     while stack:
         low, high = stack.pop()
-        if low < high:
-            q = partition(A, low, high)
-            stack.append((low, q - 1))
-            stack.append((q + 1, high))
+        while high - low + 1 > NETWORK_MAX:
+            median_of_three(A, low, high)
+            partitions += 1
+            if low > 0 and not A[low - 1] < A[high]:
+                # A[low - 1] is a lower bound of the whole range (everything
+                # left of an unsorted range is <= it), so the pivot is the
+                # minimum: move the keys equal to it to the front and drop them
+                low = partition_equal(A, low, high)
+                continue
+            q = block_partition(A, low, high)
+            if q - low < high - q:
+                stack.append((q + 1, high))
+                high = q - 1
+            else:
+                stack.append((low, q - 1))
+                low = q + 1
+            if len(stack) > max_stack:
+                max_stack = len(stack)
+        network_sort(A, low, high)
+    if stats is not None:
+        stats["max_stack"] = max_stack
+        stats["partitions"] = partitions
+    return A
+
+# Introsort
+
+# Quicksort with median-of-three pivots that falls back to heapsort once the
+# recursion depth exceeds 2*lg(n), and leaves partitions of at most
+# INTROSORT_THRESHOLD elements to a sorting network. Partitioning is
+# block_partition, which splits runs of equal keys evenly, plus the
+# partition_equal shortcut, so duplicate-heavy inputs don't exhaust the depth
+# limit and end up in heapsort.
+# Time complexity: O(nlgn) in the worst case
+# Memory Order: O(lgn), since we only recurse into the smaller side
+INTROSORT_THRESHOLD = 16
+
+def median_of_three(A, low, high):
+    """Moves the median of A[low], A[mid] and A[high] into A[high], where
+    the partition functions take their pivot from."""
+    mid = (low + high) // 2
+    if A[mid] < A[low]:
+        swap(A, low, mid)
+    if A[high] < A[low]:
+        swap(A, low, high)
+    # A[low] is now the minimum, the median is the smaller of A[mid] and A[high]
+    if A[mid] < A[high]:
+        swap(A, mid, high)
+
+def introsort(A : list) -> list:
+    """
+    Sorts a list in place using Introsort (introspective sort).
+
+    Args:
+        A (list): The list to be sorted.
+
+    Returns:
+        list: The sorted list.
+    """
+    n = len(A)
+    if n > 1:
+        introsort_loop(A, 0, n - 1, 2 * n.bit_length())
+    return A
+
+def introsort_loop(A, low, high, depth_limit):
+    while high - low + 1 > INTROSORT_THRESHOLD:
+        if depth_limit == 0:
+            heapsort_bottom_up(A, low, high)
+            return
+        depth_limit -= 1
+        median_of_three(A, low, high)
+        if low > 0 and not A[low - 1] < A[high]:
+            # the pivot is the minimum of the range (see bottom_up_quicksort):
+            # drop the keys equal to it instead of partitioning around it
+            low = partition_equal(A, low, high)
+            continue
+        q = block_partition(A, low, high)
+        # recurse into the smaller side and loop on the larger one
+        if q - low < high - q:
+            introsort_loop(A, low, q - 1, depth_limit)
+            low = q + 1
+        else:
+            introsort_loop(A, q + 1, high, depth_limit)
+            high = q - 1
+    network_sort(A, low, high)
 
 # non-comparison sorting - counting sort
 # Time-comlexity = Θ(n)
-def count_sort(A: list) -> list:
+def count_sort(A: list, key=None, reverse: bool = False, backend: str = None, out=None) -> list:
     """
     Sorts an array of integers in ascending order using Counting Sort.
+    The sort is stable. A is not modified: the sorted elements are returned
+    in a new list (a new NumPy array, or `out`, with the numpy backend).
 
     Args:
-        A (List): Input array to be sorted. Must contain integers (positive or negative).
+        A (List): Input array to be sorted. Must contain integers (positive or negative),
+            or any values if `key` maps them to integers.
+        key (callable, optional): Extracts an integer key from each element.
+        reverse (bool): Sorts in descending order, keeping equal keys stable.
+        backend (str, optional): "python" or "numpy". Defaults to "numpy" when
+            A is a NumPy array and to "python" otherwise.
+        out (numpy.ndarray, optional): Buffer the numpy backend writes the result into.
 
     Returns:
-        List: Sorted array in ascending order.
+        List: Sorted array in ascending order (numpy.ndarray with the numpy backend).
 
     Raises:
-        ValueError: If the input array contains non-integer values.
+        ValueError: If the input array (or its keys) contains non-integer values,
+            or, with the numpy backend, if max - min does not fit in np.intp.
     """
-    # Ensure all elements are integers
-    if not all(isinstance(num, int) for num in A):
+    if use_numpy_backend(A, backend, key, out):
+        return count_sort_numpy(A, reverse, out)
+
+    keys = A if key is None else [key(x) for x in A]
+    # Ensure all keys are integers
+    if not all(isinstance(num, int) for num in keys):
         raise ValueError("All elements in the input array must be integers.")
 
     if not A:
         return A
 
-    min_val = min(A)
-    max_val = max(A)
+    if reverse:
+        keys = [-num for num in keys]
+
+    min_val = min(keys)
+    max_val = max(keys)
 
     # Handle negative numbers by shifting the range
     range_of_values = max_val - min_val + 1
     count_array = [0] * range_of_values
 
     # Frequency of each element
-    for num in A:
+    for num in keys:
         count_array[num - min_val] += 1
 
     # Cumulative frequency (for ascending order this time)
     for i in range(1, range_of_values):
         count_array[i] += count_array[i - 1]
 
-    # Build the output array in ascending order
+    # Build the output array in ascending order, iterating from the end so
+    # that equal keys keep their relative order
     output = [0] * len(A)
-    for i in range(0, len(A)):  # Iterate from the start
-        output[count_array[A[i] - min_val] - 1] = A[i]
-        count_array[A[i] - min_val] -= 1
+    for i in range(len(A) - 1, -1, -1):
+        count_array[keys[i] - min_val] -= 1
+        output[count_array[keys[i] - min_val]] = A[i]
 
     return output
 
 # Radix sort
-def counting_sort(A, exp):
+def counting_sort(A, exp, keys=None, base=10):
     """
     A helper function to perform counting sort on the array based on the digit represented by exp.
+    If `keys` is given, the digit is read from keys[i] and keys is permuted along with A.
     """
     n = len(A)
     output = [0] * n  
-    count = [0] * 10  # Count array to store 10 numbers
+    count = [0] * base  # Count array to store one counter per digit value
+    digits = A if keys is None else keys
 
     #frequency
     for i in range(n):
-        index = (A[i] // exp) % 10
+        index = (digits[i] // exp) % base
         count[index] += 1
     #update coutn
-    for i in range(1, 10):
+    for i in range(1, base):
         count[i] += count[i - 1]
 
+    output_keys = None if keys is None else [0] * n
     i = n - 1
     while i >= 0:
-        index = (A[i] // exp) % 10
+        index = (digits[i] // exp) % base
         output[count[index] - 1] = A[i]
+        if keys is not None:
+            output_keys[count[index] - 1] = keys[i]
         count[index] -= 1
         i -= 1
 
     # Copy the sorted elements back into the original array
     for i in range(n):
         A[i] = output[i]
+    if keys is not None:
+        keys[:] = output_keys
 
-def radix_sort(A: list) -> list:
+def radix_sort(A: list, key=None, reverse: bool = False, backend: str = None, out=None) -> list:
     """
-    Sorts an array of non-negative integers using Radix Sort.
+    Sorts an array using Radix Sort. The sort is stable, so it can be used
+    as a building block for multi-key sorts.
+
+    The python backend sorts the list in place and returns it. The numpy
+    backend leaves A unchanged and returns a new array (or `out`); use
+    `A[:] = radix_sort(A)` or pass a separate `out` to keep the result.
+
+    Integers (including negative ones) and floats use an LSD radix sort:
+    integers are shifted by the minimum, floats are mapped to unsigned 64-bit
+    integers with the same order (see `float_radix_keys`). Fixed-width bytes
+    keys use an MSD radix sort (see `msd_radix_sort`). Keys that mix integers
+    and floats are sorted exactly with the stable `merge_sort` instead.
 
     Args:
-        A (List): Input array to be sorted. Must contain non-negative integers.
+        A (List): Input array to be sorted. Must contain integers, floats or
+            bytes of one length, or any values if `key` maps them to those.
+        key (callable, optional): Extracts an integer, float or bytes key from each element.
+        reverse (bool): Sorts in descending order, keeping equal keys stable.
+        backend (str, optional): "python" or "numpy". Defaults to "numpy" when
+            A is a NumPy array and to "python" otherwise. The numpy backend
+            accepts integer and float arrays.
+        out (numpy.ndarray, optional): Buffer the numpy backend writes the result into.
 
     Returns:
-        List: Sorted array.
+        List: A, sorted (python backend), or numpy.ndarray: the sorted copy (numpy backend).
 
     Raises:
-        ValueError: If the input array contains non-integer or negative values.
+        ValueError: If the keys are not all integers/floats or all bytes of the same length.
     """
-    # Input validation: Ensure all elements are non-negative integers
-    if not all(isinstance(num, int) and num >= 0 for num in A):
-        raise ValueError("All elements in the input array must be non-negative integers.")
+    if use_numpy_backend(A, backend, key, out):
+        return radix_sort_numpy(A, reverse, out)
+
+    keys = A if key is None else [key(x) for x in A]
 
     if not A:
-        return
+        return A
+
+    if all(isinstance(num, bytes) for num in keys):
+        return msd_radix_sort(A, keys, reverse)
+
+    base = 10
+    if all(isinstance(num, int) for num in keys):
+        # shift negative keys into the non-negative range
+        min_val = min(keys)
+        if min_val < 0:
+            keys = [num - min_val for num in keys]
+    elif all(isinstance(num, float) for num in keys):
+        keys = float_radix_keys(keys)
+        base = 256  # 8 passes over the 64-bit keys
+    elif all(isinstance(num, (int, float)) for num in keys):
+        # a mix of ints and floats has no exact 64-bit key (ints beyond 2^53
+        # lose digits as doubles), so compare the numbers themselves
+        A[:] = merge_sort(A, key=key, reverse=reverse)
+        return A
+    else:
+        raise ValueError("All elements in the input array must be integers, floats or bytes of the same length.")
+
+    if reverse:
+        # maximum - k keeps the keys non-negative and flips their order
+        maximum = max(keys)
+        keys = [maximum - num for num in keys]
 
     # Find the maximum number to determine the number of digits
-    maximum = max(A)
+    maximum = max(keys)
+    if keys is A:
+        keys = None  # the elements are their own keys
 
     # Perform counting sort for each digit, starting from the least significant digit (LSD)
     digit = 1
     while maximum // digit > 0:
-        counting_sort(A, digit)
-        digit *= 10  # Move to the next digit (e.g., units, tens, hundreds, etc.)
+        counting_sort(A, digit, keys, base)
+        digit *= base  # Move to the next digit (e.g., units, tens, hundreds, etc.)
 
     return A
 
+# IEEE-754 doubles compare like sign-magnitude integers. Flipping the sign bit
+# of non-negative floats and every bit of negative ones gives unsigned 64-bit
+# integers in the same order (-0.0 lands just before 0.0, NaNs at the ends).
+FLOAT_SIGN_BIT = 1 << 63
+FLOAT_ALL_BITS = (1 << 64) - 1
+
+def float_radix_keys(values):
+    """Maps a sequence of floats to order-preserving unsigned 64-bit integers."""
+    bits = array("Q")
+    bits.frombytes(array("d", values).tobytes())
+    return [b ^ FLOAT_ALL_BITS if b & FLOAT_SIGN_BIT else b | FLOAT_SIGN_BIT for b in bits]
+
+# MSD radix sort for fixed-width byte strings
+# Distributes the range by its d-th byte with a stable counting pass, then
+# handles each bucket on the next byte; buckets of at most MSD_CUTOFF keys
+# are finished with insertion sort.
+MSD_CUTOFF = 16
+BYTE_COMPLEMENT = bytes(range(255, -1, -1))
+
+def msd_radix_sort(A, keys, reverse=False):
+    """
+    Sorts A in place by the bytes keys (keys[i] belongs to A[i]), which must
+    all have the same length. The sort is stable.
+
+    Returns:
+        list: The sorted list.
+    """
+    n = len(A)
+    width = len(keys[0])
+    if any(len(k) != width for k in keys):
+        raise ValueError("All bytes keys must have the same length.")
+    if reverse:
+        keys = [k.translate(BYTE_COMPLEMENT) for k in keys]
+    else:
+        keys = list(keys)  # permuted along with A
+    out_items = [None] * n
+    out_keys = [None] * n
+    stack = [(0, n, 0)]  # half-open ranges [low, high) sorted up to byte d
+    while stack:
+        low, high, d = stack.pop()
+        if high - low <= MSD_CUTOFF:
+            for i in range(low + 1, high):
+                k, x = keys[i], A[i]
+                j = i - 1
+                while j >= low and keys[j] > k:
+                    keys[j + 1] = keys[j]
+                    A[j + 1] = A[j]
+                    j -= 1
+                keys[j + 1] = k
+                A[j + 1] = x
+            continue
+        if d == width:
+            continue  # all keys in the range are equal
+        count = [0] * 257
+        for i in range(low, high):
+            count[keys[i][d] + 1] += 1
+        for b in range(256):
+            count[b + 1] += count[b]
+        starts = count[:]
+        for i in range(low, high):
+            b = keys[i][d]
+            pos = low + count[b]
+            count[b] += 1
+            out_keys[pos] = keys[i]
+            out_items[pos] = A[i]
+        keys[low:high] = out_keys[low:high]
+        A[low:high] = out_items[low:high]
+        for b in range(256):
+            if starts[b + 1] - starts[b] > 1:
+                stack.append((low + starts[b], low + starts[b + 1], d + 1))
+    return A
+
+# NumPy backends for count_sort and radix_sort
+# The per-element Python loops are replaced by whole-array operations:
+# histograms come from np.bincount/np.cumsum and each radix pass scatters
+# the array by one 8 or 16 bit digit. Signed integers are biased into the
+# unsigned range by flipping the sign bit, which preserves their order.
+def use_numpy_backend(A, backend, key, out):
+    """Decides between the python and numpy backends of count_sort/radix_sort."""
+    if backend is None:
+        backend = "numpy" if np is not None and isinstance(A, np.ndarray) else "python"
+    if backend == "python":
+        if out is not None:
+            raise ValueError("out= is only supported by the numpy backend.")
+        return False
+    if backend != "numpy":
+        raise ValueError(f"Unknown backend {backend!r}, expected 'python' or 'numpy'.")
+    if np is None:
+        raise ImportError("backend='numpy' requires NumPy to be installed.")
+    if key is not None:
+        raise ValueError("key= is not supported by the numpy backend.")
+    return True
+
+def numpy_int_array(A, out, kinds="iu"):
+    """Returns A as a 1-D integer ndarray and an output buffer of the same dtype."""
+    A = np.asarray(A)
+    if A.ndim != 1 or A.dtype.kind not in kinds:
+        raise ValueError("All elements in the input array must be integers.")
+    if out is None:
+        out = np.empty_like(A)
+    elif out.shape != A.shape or out.dtype != A.dtype:
+        raise ValueError("out must have the same shape and dtype as the input array.")
+    return A, out
+
+def count_sort_numpy(A, reverse=False, out=None):
+    """
+    Counting sort of an integer array with NumPy.
+
+    Args:
+        A (array_like): 1-D array of integers.
+        reverse (bool): Sorts in descending order.
+        out (numpy.ndarray, optional): Buffer for the result, same shape and dtype as A.
+
+    Returns:
+        numpy.ndarray: The sorted array (out, if it was given).
+
+    Raises:
+        ValueError: If max - min does not fit in np.intp.
+    """
+    A, out = numpy_int_array(A, out)
+    if A.size == 0:
+        return out
+    min_val = A.min()
+    span = int(A.max()) - int(min_val)
+    if span >= np.iinfo(np.intp).max:
+        raise ValueError(f"The range of the values ({span + 1}) is too large for counting sort.")
+    # subtract the minimum in A's own dtype, read as unsigned: the offset is
+    # right even where the difference wraps around (e.g. int8 -128..127), and
+    # uint64 values beyond intp never need converting
+    offsets = (A - min_val).view(f"u{A.dtype.itemsize}").astype(np.intp)
+    counts = np.bincount(offsets)
+    values = np.flatnonzero(counts)
+    # write the first value and the gap to each next distinct value at the
+    # position where it starts, a running sum then expands the runs in place
+    # (a gap may wrap around in a narrow dtype, the running sum still lands on
+    # the right values since integer arithmetic is modular)
+    out[:] = 0
+    out[0] = min_val  # values[0] is 0, the offset of the minimum
+    out[np.cumsum(counts[values])[:-1]] = np.diff(values)
+    np.cumsum(out, out=out)
+    if reverse:
+        out[:] = out[::-1]
+    return out
+
+def radix_sort_numpy(A, reverse=False, out=None, radix_bits=8):
+    """
+    LSD radix sort of an integer or float array with NumPy, one radix_bits
+    digit per pass.
+
+    Args:
+        A (array_like): 1-D array of signed or unsigned integers, or floats.
+        reverse (bool): Sorts in descending order.
+        out (numpy.ndarray, optional): Buffer for the result, same shape and dtype as A.
+        radix_bits (int): Digit width, 8 (radix 256) or 16 (radix 65536).
+
+    Returns:
+        numpy.ndarray: The sorted array (out, if it was given).
+    """
+    if radix_bits not in (8, 16):
+        raise ValueError("radix_bits must be 8 or 16.")
+    A, out = numpy_int_array(A, out, kinds="iuf")
+    width = A.dtype.itemsize * 8
+    utype = np.dtype(f"u{A.dtype.itemsize}")
+    sign_bit = utype.type(1 << (width - 1))
+    bits = A.view(utype)
+    if A.dtype.kind == "f":
+        # same transform as float_radix_keys: negative floats get every bit
+        # flipped (~(1 - 1) == all ones), non-negative ones only the sign bit
+        bias = ~((bits >> utype.type(width - 1)) - utype.type(1)) | sign_bit
+    else:
+        bias = sign_bit if A.dtype.kind == "i" else utype.type(0)
+    keys = bits ^ bias
+    scratch = np.empty_like(keys)
+    radix_bits = min(radix_bits, width)
+    digit_type = np.dtype(f"u{radix_bits // 8}")
+    mask = (1 << radix_bits) - 1
+    n = keys.size
+    for shift in range(0, width, radix_bits):
+        digits = ((keys >> utype.type(shift)) & utype.type(mask)).astype(digit_type)
+        counts = np.bincount(digits, minlength=mask + 1)
+        if counts.max() == n:
+            continue  # every key has the same digit, nothing moves
+        # stable scatter: element i goes to starts[digit] + its rank among equal
+        # digits; for 8/16 bit digits NumPy's stable argsort is itself a counting sort
+        order = np.argsort(digits, kind="stable")
+        np.take(keys, order, out=scratch)
+        keys, scratch = scratch, keys
+    if A.dtype.kind == "f":
+        # undo the transform: keys with the top bit set were non-negative floats
+        bias = ((keys >> utype.type(width - 1)) - utype.type(1)) | sign_bit
+    np.bitwise_xor(keys, bias, out=out.view(utype))
+    if reverse:
+        out[:] = out[::-1]
+    return out
+
 def cocktail_shaker_sort(A: list) -> list:
     """
     Sorts a list using cocktail_shaker Sort (also known as Shaker Sort).
@@ -276,12 +1523,17 @@ def cocktail_shaker_sort(A: list) -> list:
 
     return A
 
-def pigeonhole_sort(A: list) -> list:
+def pigeonhole_sort(A: list, key=None, reverse: bool = False) -> list:
     """
     Sorts a list of integers using Pigeonhole Sort.
+    With `key` or `reverse` the holes keep the elements themselves in input
+    order, so the sort is stable.
 
     Args:
-        A (list): The list to be sorted (must contain integers).
+        A (list): The list to be sorted (must contain integers, or any values
+            if `key` maps them to integers).
+        key (callable, optional): Extracts an integer key from each element.
+        reverse (bool): Sorts in descending order, keeping equal keys stable.
 
     Returns:
         list: The sorted list.
@@ -289,6 +1541,19 @@ def pigeonhole_sort(A: list) -> list:
     if not A:
         return A  
 
+    if key is not None or reverse:
+        keys = A if key is None else [key(x) for x in A]
+        min_val = min(keys)
+        holes = [[] for _ in range(max(keys) - min_val + 1)]
+        for k, x in zip(keys, A):
+            holes[k - min_val].append(x)
+        if reverse:
+            holes.reverse()
+        sorted_A = []
+        for hole in holes:
+            sorted_A.extend(hole)
+        return sorted_A
+
     min_val = min(A)
     max_val = max(A)
     size = max_val - min_val + 1  
@@ -308,89 +1573,603 @@ def pigeonhole_sort(A: list) -> list:
     return sorted_A
 
 
-def flash_sort(A: list) -> list:
+# Streaming histogram sort
+# Counting sort for a stream of integers whose range is not known up front.
+# Counts start in a dense list indexed by value - lo, which grows (with slack,
+# so growth is amortized) as values outside it arrive. Once the range spans
+# more than HISTOGRAM_SPARSE_RATIO slots per distinct value (and more than
+# HISTOGRAM_DENSE_MIN slots), the counts move to a dict and only the sorted
+# distinct values are walked at the end; they move back once the distinct
+# values fill the range densely enough. A single outlier therefore costs one
+# dict entry instead of a count array the size of the range.
+# Time complexity: O(n + range) dense, O(n + d lg d) sparse for d distinct values
+# Memory Order: O(min(range, d)), at most 2*HISTOGRAM_SPARSE_RATIO*d slots dense
+HISTOGRAM_DENSE_MIN = 1024
+HISTOGRAM_SPARSE_RATIO = 8
+
+class StreamingHistogram:
+    """
+    Bounded-memory histogram of a stream of integers, read back in order.
+
+    Example:
+        h = StreamingHistogram().update(values_from_a_socket)
+        for value, count in h.runs():
+            ...
+        sorted_values = list(h.values())
+    """
+
+    def __init__(self):
+        self.lo = 0
+        self.counts = []  # dense mode: counts[v - lo]
+        self.sparse = None  # sparse mode: {value: count}
+
+    def __len__(self):
+        """Number of values counted so far."""
+        return sum(self.counts) if self.sparse is None else sum(self.sparse.values())
+
+    @property
+    def dense(self):
+        return self.sparse is None
+
+    def push(self, value, count=1):
+        """Adds `count` occurrences of one integer, in O(1) amortized time."""
+        if not isinstance(value, int):
+            raise ValueError("All elements of the stream must be integers.")
+        if count < 0:
+            raise ValueError("count must be non-negative.")
+        if not count:
+            return
+        if self.sparse is None:
+            i = value - self.lo
+            if 0 <= i < len(self.counts):
+                self.counts[i] += count
+            else:
+                self.grow(value, count)
+            return
+        sparse = self.sparse
+        if value in sparse:
+            sparse[value] += count
+            return
+        sparse[value] = count
+        # like update(), recheck the density when the distinct values double
+        if len(sparse) & (len(sparse) - 1) == 0:
+            self.densify()
+
+    def update(self, iterable):
+        """Adds every integer of an iterable (list, generator, ...)."""
+        it = iter(iterable)
+        while True:
+            if self.sparse is None:
+                counts, lo = self.counts, self.lo
+                size = len(counts)
+                try:
+                    for value in it:
+                        i = value - lo
+                        if 0 <= i < size:
+                            counts[i] += 1
+                        else:
+                            self.grow(value)
+                            break  # counts/lo changed
+                    else:
+                        return self
+                except TypeError:  # value - lo or counts[i] on a non-integer
+                    raise ValueError("All elements of the stream must be integers.") from None
+            else:
+                sparse = self.sparse
+                check_at = 2 * len(sparse)
+                for value in it:
+                    if value in sparse:
+                        sparse[value] += 1
+                    elif not isinstance(value, int):
+                        raise ValueError("All elements of the stream must be integers.")
+                    else:
+                        sparse[value] = 1
+                        # the first values of a stream look sparse; recheck
+                        # the density every time the distinct values double
+                        if len(sparse) >= check_at:
+                            if self.densify():
+                                break
+                            check_at = 2 * len(sparse)
+                else:
+                    return self
+
+    def grow(self, value, count=1):
+        """Counts a value outside the dense range: extends the range, or
+        switches to sparse mode if it would get too thin."""
+        if not isinstance(value, int):
+            raise ValueError("All elements of the stream must be integers.")
+        counts, lo = self.counts, self.lo
+        if not counts:
+            self.lo, self.counts = value, [count]
+            return
+        hi = lo + len(counts) - 1
+        span = max(hi, value) - min(lo, value) + 1
+        distinct = len(counts) - counts.count(0) + 1
+        if span > HISTOGRAM_DENSE_MIN and span > HISTOGRAM_SPARSE_RATIO * distinct:
+            self.sparse = {lo + i: c for i, c in enumerate(counts) if c}
+            self.sparse[value] = count
+            self.counts = []
+            return
+        # grow by at least the current size so repeated growth stays linear
+        extra = max(span - len(counts), len(counts))
+        if value < lo:
+            self.lo = lo - extra
+            counts[:0] = [0] * extra
+        else:
+            counts.extend([0] * extra)
+        counts[value - self.lo] += count
+
+    def densify(self):
+        """Moves the counts back into a dense list if the range is at most
+        HISTOGRAM_SPARSE_RATIO / 2 slots per distinct value (the gap to the
+        sparse threshold keeps the mode from flipping back and forth)."""
+        sparse = self.sparse
+        lo = min(sparse)
+        span = max(sparse) - lo + 1
+        if span > HISTOGRAM_DENSE_MIN and 2 * span > HISTOGRAM_SPARSE_RATIO * len(sparse):
+            return False
+        counts = [0] * span
+        for value, count in sparse.items():
+            counts[value - lo] = count
+        self.lo, self.counts, self.sparse = lo, counts, None
+        return True
+
+    def merge(self, other):
+        """Adds the counts of another histogram, e.g. one filled by another
+        worker, one run at a time: O(distinct values) (O(range) if dense)."""
+        for value, count in other.runs():
+            self.push(value, count)
+        return self
+
+    def runs(self, reverse=False):
+        """Yields (value, count) pairs in ascending (or descending) order of value."""
+        if self.sparse is not None:
+            for value in sorted(self.sparse, reverse=reverse):
+                yield value, self.sparse[value]
+            return
+        lo, counts = self.lo, self.counts
+        indices = range(len(counts) - 1, -1, -1) if reverse else range(len(counts))
+        for i in indices:
+            if counts[i]:
+                yield lo + i, counts[i]
+
+    def values(self, reverse=False):
+        """Yields every counted value, each as often as it occurred, in order."""
+        for value, count in self.runs(reverse):
+            yield from repeat(value, count)
+
+def histogram_sort(iterable, runs=False, reverse=False):
     """
-    Sorts a list of numbers using Flash Sort.
+    Sorts a stream of integers lazily with a StreamingHistogram. The input is
+    consumed on the first next(); memory is bounded by the number of distinct
+    values, not by the range or the length of the stream.
+
+    Args:
+        iterable: Integers, e.g. a generator reading a file.
+        runs (bool): Yield (value, count) pairs instead of the repeated values.
+        reverse (bool): Descending order.
+
+    Yields:
+        int or tuple: The sorted values, or (value, count) runs.
+
+    Raises:
+        ValueError: If the stream contains a non-integer.
+    """
+    histogram = StreamingHistogram().update(iterable)
+    if runs:
+        yield from histogram.runs(reverse)
+    else:
+        yield from histogram.values(reverse)
+
+# Flash sort
+# Elements are classified into m ≈ 0.43n classes by linear interpolation
+# between the minimum and the maximum, moved to their class with an in-place
+# cycle-leader permutation and every class is then sorted on its own:
+# insertion sort for small classes, the introsort loop for classes that a
+# skewed distribution made large.
+# Time complexity: O(n) expected on uniformly distributed keys, O(nlgn) worst case
+# Memory Order: Θ(m) for the class boundaries (plus Θ(n) for the class ids)
+FLASH_CLASS_RATIO = 0.43
+FLASH_INSERTION_LIMIT = 32
+
+def flash_sort(A: list, key=None, reverse: bool = False) -> list:
+    """
+    Sorts a list of numbers in place using Flash Sort. A NumPy array of
+    integers or floats is sorted with `flash_sort_numpy` instead.
+    Not stable, unless key= or reverse= is given (see `keyed_order`).
 
     Args:
         A (list): The list to be sorted (should contain comparable numbers).
+        key (callable, optional): Extracts a numeric key from each element.
+        reverse (bool): Sorts in descending order.
 
     Returns:
         list: The sorted list.
     """
+    if np is not None and isinstance(A, np.ndarray):
+        if key is not None:
+            raise ValueError("key= is not supported for NumPy arrays.")
+        return flash_sort_numpy(A, reverse)
+    if key is not None or reverse:
+        A[:] = keyed_order(lambda D: flash_sort_by(D, [k for k, _ in D]), A, key, reverse)
+        return A
+    return flash_sort_by(A, A)
+
+def flash_sort_by(A, values):
+    """Flash sort of A where element A[i] is classified by the number values[i]."""
     n = len(A)
     if n <= 1:
         return A  # Base case for empty or single-element list
 
-    min_val = min(A)
-    max_val = max(A)
+    min_val = min(values)
+    max_val = max(values)
 
     if min_val == max_val:
-        return A # handle all elements having same value
+        # every key is the same; decorated elements may still need ordering
+        return A if values is A else introsort(A)
+
+    try:
+        span = float(max_val - min_val)
+    except OverflowError:
+        span = float("inf")  # integers too far apart for a double
+    if span == float("inf"):
+        # an infinite key, or a span that overflows a double, can't be
+        # interpolated into classes
+        return introsort(A)
 
     # Calculate class sizes (number of buckets)
-    m = int(0.43 * n)  # empirically chosen factor, can vary
-    if m < 1:
-        m = 1 # min 1 class
+    m = max(2, int(FLASH_CLASS_RATIO * n))
 
-    # Create the "L" array (class distribution)
-    L = [0] * m
+    # Classify the elements once; the class ids travel with their elements
+    c = (m - 1) / span
+    cls = [int(c * (num - min_val)) for num in values]
 
-    # Classify the elements
-    for num in A:
-        k = int(((num - min_val) / (max_val - min_val)) * (m - 1))
+    # L[k] starts as the end of class k and counts down as class k is filled
+    L = [0] * m
+    for k in cls:
         L[k] += 1
-
-    # Calculate starting positions in the buckets
     for k in range(1, m):
-      L[k] += L[k - 1]
+        L[k] += L[k - 1]
+    starts = [0] + L[:-1]
 
-    # Permutation phase
-    hold = A[0]
+    # Permutation phase (cycle leader): A[j] is the first element that isn't
+    # in its class yet. It is dropped into the last free slot of its class,
+    # the element found there is carried on, until the cycle comes back to j.
     move = 0
     j = 0
-    k = m - 1  # last class for start
+    k = m - 1
     while move < n - 1:
-        while j > L[k]-1:
-          k -= 1 # find the new class
-        if k < 0:
-          k = 0
-        while j <= L[k]-1: # find the new place for hold
-          j +=1
-        if move > 0 and j >= n:
-            break # if not first move and all elements are traversed then break out
-        
-        temp = A[j]
-        A[j] = hold
-        hold = temp
-        L[k] -= 1
-        move += 1
-       
-    # Insertion sort phase within each class
-    for i in range(1,n):
-      hold = A[i]
-      j = i-1
-      while j >= 0 and A[j] > hold:
-        A[j+1] = A[j]
-        j -=1
-      A[j+1] = hold
+        while j > L[k] - 1:
+            j += 1
+            k = cls[j]
+        flash, flash_cls = A[j], cls[j]
+        while j != L[k]:
+            k = flash_cls
+            L[k] -= 1
+            t = L[k]
+            A[t], flash = flash, A[t]
+            cls[t], flash_cls = flash_cls, cls[t]
+            move += 1
+
+    # Sort every class on its own
+    depth_limit = 2 * n.bit_length()
+    for k in range(m):
+        low = starts[k]
+        high = (starts[k + 1] if k + 1 < m else n) - 1
+        if high - low < 1:
+            continue
+        if high - low < FLASH_INSERTION_LIMIT:
+            insertion_sort(A, low, high)
+        else:
+            introsort_loop(A, low, high, depth_limit)
+
+    return A
+
+def flash_sort_numpy(A, reverse=False, out=None):
+    """
+    Flash sort of an integer or float NumPy array.
+
+    Classification is vectorized. At most 65536 classes are used, so a class
+    id fits in 16 bits and NumPy's stable argsort groups the classes with a
+    counting sort (an out-of-place version of the cycle-leader permutation).
+    Each class is then sorted on its own.
 
+    Args:
+        A (array_like): 1-D array of integers or floats.
+        reverse (bool): Sorts in descending order.
+        out (numpy.ndarray, optional): Buffer for the result, same shape and dtype as A.
+
+    Returns:
+        numpy.ndarray: The sorted array (out, if it was given).
+    """
+    A, out = numpy_int_array(A, out, kinds="iuf")
+    n = A.size
+    if n == 0:
+        return out
+    min_val, max_val = A.min(), A.max()
+    span = float(max_val) - float(min_val)
+    if min_val == max_val or span == float("inf"):
+        # one class, or an infinite span that can't be interpolated (see flash_sort_by)
+        out[:] = A
+        out.sort()
+        if reverse:
+            out[:] = out[::-1]
+        return out
+    m = int(min(max(2, FLASH_CLASS_RATIO * n), 1 << 16))
+    scale = (m - 1) / span
+    cls = ((A.astype(np.float64) - float(min_val)) * scale).astype(np.uint16)
+    np.take(A, np.argsort(cls, kind="stable"), out=out)
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(cls, minlength=m))))
+    for k in np.flatnonzero(np.diff(bounds) > 1):
+        out[bounds[k]:bounds[k + 1]].sort()
+    if reverse:
+        out[:] = out[::-1]
+    return out
+
+# Algorithm selection (smart_sort)
+# A few cheap statistics of the input pick the implementation: a random
+# sample of adjacent pairs estimates how presorted the list is, a sample of
+# elements its type, and for integers min()/max() give the range. The
+# thresholds below were measured with sortbench on one machine; `calibrate`
+# refits them to the results of a run on the host that will do the sorting.
+SMART_SORT_THRESHOLDS = {
+    # at most this many elements: introsort (its sorting networks) directly
+    "small_n": NETWORK_MAX,
+    # adjacent pairs sampled to estimate sortedness, elements sampled for the type
+    "sample_size": 128,
+    # fraction of descending (or ascending) sampled pairs up to which the
+    # run-merging adaptive_sort beats every other sort...
+    "sorted_descents": 0.01,
+    # ...and up to which it still beats introsort
+    "presorted_descents": 0.1,
+    # integers whose range (max - min + 1) is at most this factor times n go to
+    # the counting sort below
+    "counting_range_factor": 4.0,
+    "counting_sort": "pigeonhole_sort",
+    # wider integer lists of at least this many elements go to radix_sort;
+    # None disables it (the decimal LSD radix sort lost to introsort here)
+    "radix_min_n": None,
+}
+
+logger = logging.getLogger(__name__)
+
+def sample_descents(A, sample_size, rng=random):
+    """Fraction of sampled adjacent pairs (A[i], A[i + 1]) that are descending."""
+    n = len(A)
+    positions = range(n - 1) if n - 1 <= sample_size else rng.sample(range(n - 1), sample_size)
+    return sum(1 for i in positions if A[i + 1] < A[i]) / len(positions)
+
+def choose_algorithm(A, thresholds=None):
+    """
+    Picks the sort for A from cheap input statistics (see smart_sort).
+
+    Returns:
+        tuple: (name of a function of this module, reason for the choice)
+    """
+    t = SMART_SORT_THRESHOLDS if thresholds is None else thresholds
+    n = len(A)
+    if n <= t["small_n"]:
+        return "introsort", f"n={n} <= {t['small_n']}"
+
+    if np is not None and isinstance(A, np.ndarray):
+        if A.ndim == 1 and A.dtype.kind in "iu":
+            value_range = int(A.max()) - int(A.min()) + 1
+            if value_range <= t["counting_range_factor"] * n:
+                return "count_sort", f"integer array with range {value_range} <= {t['counting_range_factor']}*n"
+            return "radix_sort", f"integer array with range {value_range}"
+        if A.ndim == 1 and A.dtype.kind == "f":
+            return "radix_sort", "float array"
+        return "introsort", f"array of dtype {A.dtype}"
+
+    descents = sample_descents(A, t["sample_size"])
+    disorder = min(descents, 1 - descents)
+    if disorder <= t["sorted_descents"]:
+        return "adaptive_sort", f"{descents:.0%} of sampled pairs descending"
+
+    sample = A if n <= t["sample_size"] else random.sample(A, t["sample_size"])
+    if all(type(x) is int for x in sample) and all(type(x) is int for x in A):
+        value_range = max(A) - min(A) + 1
+        if value_range <= t["counting_range_factor"] * n:
+            return t["counting_sort"], f"integers with range {value_range} <= {t['counting_range_factor']}*n"
+        if t["radix_min_n"] is not None and n >= t["radix_min_n"]:
+            return "radix_sort", f"integers with range {value_range}, n={n} >= {t['radix_min_n']}"
+
+    if disorder <= t["presorted_descents"]:
+        return "adaptive_sort", f"{descents:.0%} of sampled pairs descending"
+    return "introsort", "no exploitable structure found"
+
+def smart_sort(A, thresholds=None):
+    """
+    Sorts A in place with the implementation that suits its contents:
+    adaptive_sort for (nearly) sorted or reversed input, pigeonhole/count
+    sort for integers in a small range, radix sort for wide integers (if
+    calibrated to pay off, always for NumPy arrays) and introsort otherwise.
+    The decision is logged at INFO level on this module's logger.
+
+    Args:
+        A (list): The list (or 1-D NumPy array) to be sorted.
+        thresholds (dict, optional): Overrides SMART_SORT_THRESHOLDS, e.g. the
+            result of `calibrate`.
+
+    Returns:
+        list: A, sorted.
+    """
+    name, reason = choose_algorithm(A, thresholds)
+    logger.info("smart_sort: n=%d, %s -> %s", len(A), reason, name)
+    result = globals()[name](A)
+    if result is not None and result is not A:
+        A[:] = result
     return A
 
+def calibrate(results, thresholds=None):
+    """
+    Refits the smart_sort thresholds to sortbench results measured on this host.
+
+    Uses the medians of introsort, count_sort, pigeonhole_sort, radix_sort and
+    adaptive_sort on the "uniform" (range about n), "wide" (32-bit) and
+    "sorted" distributions; thresholds without matching rows are left as they are.
 
-# The array A is sorted in place
+    Args:
+        results (list or str): Rows returned by sortbench.run_benchmark, or
+            the path of a JSON file written by `sortbench.py --json`.
+        thresholds (dict, optional): Updated in place, defaults to SMART_SORT_THRESHOLDS.
+
+    Returns:
+        dict: The updated thresholds.
+    """
+    t = SMART_SORT_THRESHOLDS if thresholds is None else thresholds
+    if isinstance(results, str):
+        with open(results) as f:
+            results = json.load(f)
+    medians = {(row["algorithm"], row["distribution"], row["n"]): row["median"]
+               for row in results if row.get("error") is None and row.get("correct")}
+
+    def speedups(algorithm, distribution):
+        """introsort time / algorithm time for every size measured with both."""
+        return {n: medians[("introsort", d, n)] / medians[(a, d, n)]
+                for a, d, n in medians
+                if a == algorithm and d == distribution and ("introsort", d, n) in medians}
+
+    # counting sort time grows with n + range, so the speedup over introsort
+    # measured at range ~ n is a conservative bound on the range factor
+    counting = {a: speedups(a, "uniform") for a in ("count_sort", "pigeonhole_sort")}
+    counting = {a: statistics.median(s.values()) for a, s in counting.items() if s}
+    if counting:
+        best = max(counting, key=counting.get)
+        t["counting_sort"] = best
+        t["counting_range_factor"] = round(counting[best], 2)
+
+    radix = speedups("radix_sort", "wide")
+    if radix:
+        faster = [n for n, speedup in radix.items() if speedup > 1]
+        t["radix_min_n"] = min(faster) if faster else None
+
+    adaptive = speedups("adaptive_sort", "sorted")
+    if adaptive and statistics.median(adaptive.values()) <= 1:
+        t["sorted_descents"] = t["presorted_descents"] = -1  # never pays off
+    return t
+
+# Every trial sorts a fresh copy of A, so A itself is left unchanged and later
+# trials don't measure the already-sorted best case
 def measure_running_time(sort_func, A, p=None, r=None, trials=100):
     total_time = 0
     for _ in range(trials):
+        B = A.copy()
         start_time = time.perf_counter()
         if p is None or r is None:
-            sort_func(A)
+            sort_func(B)
         else:
-            sort_func(A, p, r)
+            sort_func(B, p, r)
         end_time = time.perf_counter()
         total_time += (end_time - start_time)
     return total_time / trials
 
+def measure_peak_memory(sort_func, A):
+    """Returns the peak number of bytes allocated while sorting a copy of A,
+    as reported by tracemalloc."""
+    A = A.copy()
+    tracemalloc.start()
+    sort_func(A)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def zipf_list(n, s=1.5, distinct=100, rng=random):
+    """Returns n integers in [0, distinct) drawn from a Zipf distribution
+    with exponent s, a stand-in for low-cardinality keys such as status codes."""
+    weights = [1 / k ** s for k in range(1, distinct + 1)]
+    return rng.choices(range(distinct), weights=weights, k=n)
+
+def benchmark_three_way(n=5000, s=1.5, distinct=100, trials=5):
+    """Compares two-way and three-way quicksort on Zipf-distributed keys.
+    Every trial sorts a fresh copy of the same input."""
+    A = zipf_list(n, s, distinct)
+    results = {}
+    for three_way in (False, True):
+        total_time = 0
+        for _ in range(trials):
+            B = A.copy()
+            start_time = time.perf_counter()
+            quicksort(B, 0, n - 1, three_way)
+            total_time += time.perf_counter() - start_time
+        results[three_way] = total_time / trials
+    print(f"Zipf(s={s}, distinct={distinct}), n={n}")
+    print(f"Two-way quicksort running time: {results[False]:.6f} seconds")
+    print(f"Three-way quicksort running time: {results[True]:.6f} seconds")
+    print(f"Speedup: {results[False] / results[True]:.2f}x")
+    return results
+
+def benchmark_networks(sizes=range(2, NETWORK_MAX + 1), blocks=2000, trials=5):
+    """Times network_sort against insertion_sort on `blocks` random ranges of
+    each size and prints the crossover: the largest size up to which the
+    network was faster at every size.
+
+    Returns:
+        int: The crossover size (1 if insertion sort always won)."""
+    crossover = 1
+    for n in sizes:
+        A = [random.random() for _ in range(n * blocks)]
+        results = {}
+        for name, kernel in (("network", network_sort), ("insertion", insertion_sort)):
+            best = float("inf")
+            for _ in range(trials):
+                B = A.copy()
+                start_time = time.perf_counter()
+                for low in range(0, len(B), n):
+                    kernel(B, low, low + n - 1)
+                best = min(best, time.perf_counter() - start_time)
+            results[name] = best / blocks
+        if results["network"] < results["insertion"] and crossover == n - 1:
+            crossover = n
+        print(f"n={n:>2}: network {results['network'] * 1e6:7.3f} us, "
+              f"insertion sort {results['insertion'] * 1e6:7.3f} us, "
+              f"speedup {results['insertion'] / results['network']:.2f}x")
+    print(f"Sorting networks are faster up to n={crossover}")
+    return crossover
+
+def rss_worker(sort_name, n, seed, conn):
+    """Runs in a fresh process: sorts n random floats with the named sort and
+    sends back how much the peak resident set size grew."""
+    rng = random.Random(seed)
+    A = [rng.random() for _ in range(n)]
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    globals()[sort_name](A)
+    conn.send(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+    conn.close()
+
+def peak_rss_growth(sort_name, n, seed=0):
+    """Returns the growth of the peak RSS (KiB on Linux, bytes on macOS) caused
+    by sorting n random floats with the named sort of this module, measured
+    in a new process so that earlier allocations don't hide it, or None
+    where the resource module is not available."""
+    if resource is None:
+        return None
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=rss_worker, args=(sort_name, n, seed, sender))
+    process.start()
+    growth = receiver.recv()
+    process.join()
+    return growth
+
+def benchmark_block_merge(n=1000000, trials=1):
+    """Compares block_merge_sort with merge_sort and merge_sort_buffered on n
+    random floats: running time, peak traced allocations and peak RSS growth.
+    Below a few hundred thousand elements the RSS growth is often 0, as the
+    temporaries fit in memory the interpreter had already reserved."""
+    A = [random.random() for _ in range(n)]
+    results = {}
+    for sort_func in (merge_sort, merge_sort_buffered, block_merge_sort):
+        name = sort_func.__name__
+        results[name] = {
+            "time": measure_running_time(sort_func, A, trials=trials),
+            "peak_bytes": measure_peak_memory(sort_func, A),
+            "peak_rss_growth": peak_rss_growth(name, n),
+        }
+        print(f"{name:<20} {results[name]['time']:.3f} s, peak allocations {results[name]['peak_bytes']} bytes, "
+              f"peak RSS growth {results[name]['peak_rss_growth']}")
+    return results
+
 # def measure_running_time(sort_func, A, p=None, r=None):
 #     start_time = time.time()
 #     if p is None or r is None:
@@ -401,88 +2180,5 @@ def measure_running_time(sort_func, A, p=None, r=None, trials=100):
 #     return end_time - start_time
 
 if __name__ == "__main__":
-    A = []
-    size = 0
-
-    while True:
-        try:
-            n = input("Enter your number, Otherwise press SORT to sort or EXIT for termination: ")
-            if n.upper() == "SORT":
-                if size == 0:
-                    print("No numbers entered. Please enter numbers first.")
-                    continue
-
-                A_normal = A.copy()
-                A_randomized = A.copy()
-                A_insertion = A.copy()
-                A_merge = A.copy()
-                A_bubble = A.copy()
-                A_selection = A.copy()
-                A_heap = A.copy()
-                A_bottom_up = A.copy()
-                A_counting = A.copy()
-                A_radix = A.copy()
-                A_cocktail_shaker = A.copy()
-                A_pigeonhole = A.copy()
-                A_flash = A.copy()
-                
-                quicksort_time = measure_running_time(quicksort, A_normal, 0, size - 1)
-                print(f"Quicksort sorted array: {A_normal}")
-                print(f"Quicksort running time: {quicksort_time:.6f} seconds")
-
-                randomized_quicksort_time = measure_running_time(randomized_quicksort, A_randomized, 0, size - 1)
-                print(f"Randomized Quicksort sorted array: {A_randomized}")
-                print(f"Randomized Quicksort running time: {randomized_quicksort_time:.6f} seconds")
-
-                insertion_sort_time = measure_running_time(insertion_sort, A_insertion)
-                print(f"Insertion Sort sorted array: {A_insertion}")
-                print(f"Insertion Sort running time: {insertion_sort_time:.6f} seconds")
-
-                merge_sort_time = measure_running_time(merge_sort, A_merge)
-                print(f"Merge Sort sorted array: {A_merge}")
-                print(f"Merge Sort running time: {merge_sort_time:.6f} seconds")
-
-                bubble_sort_time = measure_running_time(bubble_sort, A_bubble)
-                print(f"Bubble Sort sorted array: {A_bubble}")
-                print(f"Bubble Sort running time: {bubble_sort_time:.6f} seconds")
-
-                selection_sort_time = measure_running_time(selection_sort, A_selection)
-                print(f"Selection Sort sorted array: {A_selection}")
-                print(f"Selection Sort running time: {selection_sort_time:.6f} seconds")
-
-                heapsort_time = measure_running_time(heapsort, A_heap)
-                print(f"Heapsort sorted array: {A_heap}")
-                print(f"Heapsort running time: {heapsort_time:.6f} seconds")
-
-                bottom_up_quicksort_time = measure_running_time(bottom_up_quicksort, A_bottom_up)
-                print(f"Bottom-Up Quicksort sorted array: {A_bottom_up}")
-                print(f"Bottom-Up Quicksort running time: {bottom_up_quicksort_time:.6f} seconds")
-                
-                counting_sort_time = measure_running_time(count_sort , A_counting)
-                print(f"Counting-sort sorted array: {A_counting}")
-                print(f"Counting-sort running time: {counting_sort_time:.6f} seconds")
-                
-                radix_sort_time = measure_running_time(radix_sort , A_radix)
-                print(f"radix-sort sorted array: {A_radix}")
-                print(f"radix-sort running time: {radix_sort_time:.6f} seconds")
-                
-                cocktail_shaker_sort_time = measure_running_time(cocktail_shaker_sort , A_cocktail_shaker)
-                print(f"cocktail_shaker/shaker-sort sorted array: {A_cocktail_shaker}")
-                print(f"cocktail_shaker/shaker-sort running time: {cocktail_shaker_sort_time:.6f} seconds")
-                
-                pigeonhole_sort_time = measure_running_time(pigeonhole_sort , A_pigeonhole)
-                print(f"cocktail_shaker/shaker-sort sorted array: {A_pigeonhole}")
-                print(f"cocktail_shaker/shaker-sort running time: {pigeonhole_sort_time:.6f} seconds")
-                
-                flash_sort_time = measure_running_time(flash_sort , A_flash)
-                print(f"cocktail_shaker/shaker-sort sorted array: {A_flash}")
-                print(f"cocktail_shaker/shaker-sort running time: {flash_sort_time:.6f} seconds")
-                
-            elif n.upper() == "EXIT":
-                break
-            else:
-                n = int(n)
-                size += 1
-                A.append(n)
-        except ValueError:
-            print("Invalid input. Please enter a valid number or 'SORT'/'EXIT'.")
\ No newline at end of file
+    from sortbench import main
+    main()
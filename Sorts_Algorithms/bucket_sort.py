@@ -1,54 +1,122 @@
+import random
 import time
+from bisect import bisect_right
 
-def insertion_sort(A: list) -> list:
+from Sort_comparisons import introsort_loop
+
+# Number of keys sampled to estimate the distribution
+SAMPLE_SIZE = 256
+# Buckets with more elements than this are sorted with the introsort loop
+# instead of insertion sort
+DENSE_BUCKET = 32
+
+
+def insertion_sort(A: list, low: int = 0, high: int = None) -> list:
     """
-    Sorts a list using Insertion Sort.
+    Sorts a list (or A[low..high]) using Insertion Sort.
     """
-    for i in range(1, len(A)):
+    if high is None:
+        high = len(A) - 1
+    for i in range(low + 1, high + 1):
         key = A[i]
         j = i - 1
-        while j >= 0 and A[j] > key:
+        while j >= low and A[j] > key:
             A[j + 1] = A[j]
             j -= 1
         A[j + 1] = key
     return A
 
 
-def bucket_sort(A: list) -> list:
+def bucket_boundaries(keys, lo, hi, buckets):
     """
-    Sorts an array of floating-point numbers using Bucket Sort.
+    Estimates the distribution of keys from a random sample (a small
+    quantile sketch) and returns (cuts, per): the sample quantiles cuts[0] = lo
+    < ... < cuts[-1] = hi split the range into len(cuts) - 1 segments holding
+    about the same number of keys, and each segment is divided linearly into
+    `per` buckets. Skewed data therefore still spreads evenly over the buckets.
+    """
+    sample = random.sample(keys, min(len(keys), SAMPLE_SIZE))
+    sample.sort()
+    segments = max(1, min(buckets, len(sample)))
+    cuts = [lo]
+    for i in range(1, segments):
+        q = sample[i * len(sample) // segments]
+        if lo < q < hi and q > cuts[-1]:
+            cuts.append(q)
+    cuts.append(hi)
+    return cuts, max(1, buckets // (len(cuts) - 1))
+
+
+def bucket_sort(A: list, lo=None, hi=None, buckets: int = None, key=None) -> list:
+    """
+    Sorts an array of numbers using Bucket Sort. The sort is stable.
+
+    Bucket boundaries follow sampled quantiles of the keys (see
+    `bucket_boundaries`), the elements are scattered into one preallocated
+    output list by bucket and every bucket is sorted in place there:
+    insertion sort for small buckets, the introsort loop for dense ones.
 
     Args:
-        A (List): Input array to be sorted. Must contain floating-point numbers in the range [0, 1).
+        A (List): Input array to be sorted. Must contain numbers (or anything `key` maps to numbers).
+        lo (number, optional): Lower end of the key range, detected if not given.
+        hi (number, optional): Upper end of the key range, detected if not given.
+            Keys outside [lo, hi] go to the first or last bucket.
+        buckets (int, optional): Number of buckets, defaults to len(A).
+        key (callable, optional): Extracts the numeric key from each element.
 
     Returns:
         List: Sorted array.
     """
-    if not A:
-        return A  # Return empty list if input is empty
-
-    # Input validation: Ensure all elements are floats in the range [0, 1)
-    if not all(isinstance(num, float) and 0.0 <= num < 1.0 for num in A):
-        raise ValueError("All elements in the input array must be floats in the range [0, 1).")
-
     n = len(A)
-    buckets = [[] for _ in range(n)]  # Create n empty buckets
-
-    # Distribute elements into buckets
-    for num in A:
-        bucket_index = int(n * num)
-        buckets[bucket_index].append(num)
-
-    # Sort elements within each bucket (using insertion sort)
-    for i in range(len(buckets)):
-        buckets[i] = insertion_sort(buckets[i])
-
-    # Concatenate the sorted buckets
-    sorted_A = []
-    for bucket in buckets:
-        sorted_A.extend(bucket)
-
-    return sorted_A
+    if n == 0:
+        return list(A)  # Return empty list if input is empty
+
+    keys = A if key is None else [key(x) for x in A]
+    lo = min(keys) if lo is None else lo
+    hi = max(keys) if hi is None else hi
+    if not lo < hi:
+        # an empty range was given, fall back to the actual one
+        lo, hi = min(keys), max(keys)
+        if lo == hi:
+            return list(A)  # a single key value: already in order
+
+    cuts, per = bucket_boundaries(keys, lo, hi, buckets or n)
+    last = len(cuts) - 2
+    total = (last + 1) * per
+
+    # bucket of every element: its quantile segment, then a linear position inside it
+    index = [0] * n
+    counts = [0] * (total + 1)
+    for i, k in enumerate(keys):
+        c = bisect_right(cuts, k, 1, last + 1) - 1
+        f = int((k - cuts[c]) * per / (cuts[c + 1] - cuts[c]))
+        b = c * per + (0 if f < 0 else per - 1 if f >= per else f)
+        index[i] = b
+        counts[b + 1] += 1
+    for b in range(total):
+        counts[b + 1] += counts[b]
+    starts = counts[:]
+
+    # scatter into the preallocated output, decorated with (key, position)
+    # when a key function is used so ties keep their input order
+    output = [None] * n
+    for i in range(n):
+        b = index[i]
+        output[counts[b]] = A[i] if key is None else (keys[i], i)
+        counts[b] += 1
+
+    for b in range(total):
+        low, high = starts[b], starts[b + 1] - 1
+        if high - low < 1:
+            continue
+        if high - low < DENSE_BUCKET:
+            insertion_sort(output, low, high)
+        else:
+            introsort_loop(output, low, high, 2 * n.bit_length())
+
+    if key is not None:
+        output = [A[i] for _, i in output]
+    return output
 
 def measure_running_time(sort_func, A):
     """
@@ -73,7 +141,7 @@ if __name__ == "__main__":
 
     while True:
         try:
-            n = input("Enter a floating-point number in the range [0, 1), or press SORT to sort or EXIT to terminate: ")
+            n = input("Enter a number, or press SORT to sort or EXIT to terminate: ")
             if n.upper() == "SORT":
                 if size == 0:
                     print("No numbers entered. Please enter numbers first.")
@@ -92,10 +160,7 @@ if __name__ == "__main__":
                 break
             else:
                 n = float(n)  # Convert input to float
-                if 0.0 <= n < 1.0:  # Ensure the number is in the range [0, 1)
-                    size += 1
-                    A.append(n)
-                else:
-                    print("Invalid input. Please enter a floating-point number in the range [0, 1).")
+                size += 1
+                A.append(n)
         except ValueError:
-            print("Invalid input. Please enter a valid floating-point number or 'SORT'/'EXIT'.")
\ No newline at end of file
+            print("Invalid input. Please enter a valid number or 'SORT'/'EXIT'.")
\ No newline at end of file
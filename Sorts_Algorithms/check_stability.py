@@ -0,0 +1,81 @@
+import argparse
+import random
+
+from bucket_sort import bucket_sort
+from Sort_comparisons import (
+    adaptive_sort,
+    count_sort,
+    flash_sort,
+    heapsort,
+    insertion_sort,
+    merge_sort,
+    partial_sort,
+    pigeonhole_sort,
+    quicksort,
+    radix_sort,
+)
+
+# Every sort that accepts key=/reverse=, called as KEYED_SORTS[name](A, key, reverse);
+# each one either sorts A in place or returns the sorted list
+KEYED_SORTS = {
+    "quicksort": lambda A, key, reverse: quicksort(A, 0, len(A) - 1, key=key, reverse=reverse),
+    "quicksort_three_way": lambda A, key, reverse: quicksort(A, 0, len(A) - 1, three_way=True, key=key, reverse=reverse),
+    "insertion_sort": lambda A, key, reverse: insertion_sort(A, key=key, reverse=reverse),
+    "merge_sort": lambda A, key, reverse: merge_sort(A, key=key, reverse=reverse),
+    "adaptive_sort": lambda A, key, reverse: adaptive_sort(A, key=key, reverse=reverse),
+    "heapsort": lambda A, key, reverse: heapsort(A, key=key, reverse=reverse),
+    "partial_sort": lambda A, key, reverse: partial_sort(A, len(A), key=key, reverse=reverse),
+    "count_sort": lambda A, key, reverse: count_sort(A, key=key, reverse=reverse),
+    "radix_sort": lambda A, key, reverse: radix_sort(A, key=key, reverse=reverse),
+    "pigeonhole_sort": lambda A, key, reverse: pigeonhole_sort(A, key=key, reverse=reverse),
+    "flash_sort": lambda A, key, reverse: flash_sort(A, key=key, reverse=reverse),
+}
+
+# bucket_sort has key= but no reverse=
+ASCENDING_ONLY = {"bucket_sort": lambda A, key, reverse: bucket_sort(A, key=key)}
+
+
+def records(n, distinct, rng):
+    """n (key, id) records with at most `distinct` different integer keys, so
+    most keys repeat; the ids tell equal-key records apart."""
+    return [(rng.randrange(distinct), i) for i in range(n)]
+
+
+def check_stability(trials=200, max_n=300, seed=None):
+    """
+    Sorts records with duplicate keys by their key with every keyed sort, in
+    both directions, and compares the result with sorted(..., key=, reverse=),
+    which is stable. The key function never looks at the id, so any
+    difference means equal keys were reordered.
+
+    Returns:
+        list: (sort name, reverse, input) for every mismatch; empty if all
+            the sorts are stable.
+    """
+    rng = random.Random(seed)
+    key = lambda record: record[0]
+    sorts = [(name, sort, reverse) for name, sort in KEYED_SORTS.items() for reverse in (False, True)]
+    sorts += [(name, sort, False) for name, sort in ASCENDING_ONLY.items()]
+    failures = []
+    for _ in range(trials):
+        A = records(rng.randint(0, max_n), rng.choice([1, 2, 5, 50]), rng)
+        for name, sort, reverse in sorts:
+            B = A.copy()
+            result = sort(B, key, reverse)
+            if (B if result is None else result) != sorted(A, key=key, reverse=reverse):
+                failures.append((name, reverse, A))
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the keyed sorts of Sort_comparisons are stable")
+    parser.add_argument("--trials", type=int, default=200, help="Random inputs per sort")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the inputs")
+    args = parser.parse_args()
+
+    failures = check_stability(args.trials, seed=args.seed)
+    for name, reverse, A in failures[:10]:
+        print(f"{name} (reverse={reverse}) is not stable on {A}")
+    names = len(KEYED_SORTS) + len(ASCENDING_ONLY)
+    print(f"{names} sorts checked, {len(failures)} unstable results")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,238 @@
+import argparse
+import heapq
+import os
+import tempfile
+from array import array
+
+from parallel_sort import ALGORITHMS, INT64_MAX, INT64_MIN
+
+# Rough size of one number held in a Python list: the 8 byte pointer plus
+# the int/float object itself. Used to turn memory_limit into a chunk length.
+BYTES_PER_ITEM = 40
+# Read buffer of one run during the merge; the fan-in of a merge pass is
+# limited so that all run buffers fit in memory_limit
+MERGE_BUFFER_BYTES = 64 * 1024
+
+
+def parse_number(line):
+    """Parses one line of the input file as an int, or as a float if it isn't
+    one. NaN is rejected, since it has no place in a sorted order."""
+    try:
+        return int(line)
+    except ValueError:
+        value = float(line)
+    if value != value:
+        raise ValueError(f"{line!r} is NaN, which can't be sorted")
+    return value
+
+
+def format_number(value):
+    return f"{value!r}\n" if isinstance(value, float) else f"{value}\n"
+
+
+def read_chunks(in_path, chunk_items):
+    """Yields lists of at most chunk_items numbers read from a newline-delimited file."""
+    chunk = []
+    with open(in_path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                chunk.append(parse_number(line))
+            except ValueError as e:
+                raise ValueError(f"{in_path}, line {number}: {e}") from None
+            if len(chunk) == chunk_items:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def split_by_typecode(values):
+    """Splits a chunk into lists by run typecode: 'q' for int64 integers, 'd'
+    for floats and 't' for larger integers, so every value is spilled
+    exactly. Returns a dict of the non-empty lists, in their input order."""
+    runs = {}
+    for value in values:
+        if type(value) is float:
+            typecode = "d"
+        elif INT64_MIN <= value <= INT64_MAX:
+            typecode = "q"
+        else:
+            typecode = "t"
+        runs.setdefault(typecode, []).append(value)
+    return runs
+
+
+def run_typecode(path):
+    with open(path, "rb") as f:
+        return f.read(1).decode()
+
+
+def write_run(values, directory, typecode):
+    """
+    Writes sorted numbers (a list or any iterable) to a temporary run file.
+    The file is one typecode byte ('q' for int64, 'd' for float) followed by
+    the raw array data, written MERGE_BUFFER_BYTES at a time. Integers beyond
+    int64 go to 't' runs, which hold one decimal number per line instead.
+
+    Returns:
+        tuple: (path of the run file, number of bytes written)
+    """
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    size = 1
+    with os.fdopen(fd, "wb") as f:
+        f.write(typecode.encode())
+        if typecode == "t":
+            for value in values:
+                line = f"{value}\n".encode()
+                f.write(line)
+                size += len(line)
+            return path, size
+        if isinstance(values, list):
+            data = array(typecode, values)
+            data.tofile(f)
+            return path, size + len(data) * data.itemsize
+        block_items = MERGE_BUFFER_BYTES // array(typecode).itemsize
+        data = array(typecode)
+        for value in values:
+            data.append(value)
+            if len(data) == block_items:
+                data.tofile(f)
+                size += len(data) * data.itemsize
+                data = array(typecode)
+        data.tofile(f)
+        size += len(data) * data.itemsize
+    return path, size
+
+
+def read_run(path, buffer_bytes):
+    """Streams the numbers of a run file, reading about buffer_bytes at a time."""
+    with open(path, "rb") as f:
+        typecode = f.read(1).decode()
+        if typecode == "t":
+            for line in f:
+                yield int(line)
+            return
+        items = max(1, buffer_bytes // array(typecode).itemsize)
+        while True:
+            data = array(typecode)
+            try:
+                data.fromfile(f, items)
+            except EOFError:
+                pass  # last, partial block; data holds what was read
+            if not data:
+                return
+            yield from data
+
+
+def merge_runs_to_file(paths, directory, buffer_bytes):
+    """Merges sorted run files of the same typecode into a single run file
+    and deletes the inputs.
+
+    Returns:
+        tuple: (path of the merged run, number of bytes written)
+    """
+    typecode = run_typecode(paths[0])
+    result = write_run(heapq.merge(*(read_run(path, buffer_bytes) for path in paths)), directory, typecode)
+    for path in paths:
+        os.remove(path)
+    return result
+
+
+def external_sort(in_path: str, out_path: str, memory_limit: int = 64 * 1024 * 1024,
+                  algorithm: str = "introsort", tmp_dir: str = None) -> dict:
+    """
+    Sorts a newline-delimited file of numbers that may not fit in memory.
+
+    1. The input is read in chunks of about memory_limit bytes, each chunk is
+       split by type (int64, float, larger int), and each part is sorted
+       with an in-memory algorithm from Sort_comparisons and spilled to a
+       temporary run file in a compact binary format, so every number is
+       written back exactly.
+    2. If there are more runs than fit in memory with a read buffer each,
+       groups of runs of the same type are merged into longer runs first.
+    3. The remaining runs are streamed through a heap-based k-way merge
+       (heapq.merge, which compares ints and floats exactly) into out_path,
+       one buffered block at a time.
+
+    Args:
+        in_path (str): Input file, one int or float per line (not NaN).
+        out_path (str): Output file, written in ascending order.
+        memory_limit (int): Approximate peak memory for the numbers, in bytes.
+        algorithm (str): In-memory sort for the chunks, a key of parallel_sort.ALGORITHMS.
+        tmp_dir (str, optional): Where the run files are spilled.
+
+    Returns:
+        dict: "items" sorted, "runs" spilled by the first pass, "merge_passes"
+            before the final merge and "bytes_spilled" to run files.
+
+    Raises:
+        ValueError: If a line is not a number or is NaN.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {sorted(ALGORITHMS)}.")
+    chunk_items = max(1, memory_limit // BYTES_PER_ITEM)
+    # at least 3, so with runs of all three types a pass always has two runs
+    # of one type to merge
+    fan_in = max(3, memory_limit // MERGE_BUFFER_BYTES)
+    stats = {"items": 0, "runs": 0, "merge_passes": 0, "bytes_spilled": 0}
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as directory:
+        paths = []
+        for chunk in read_chunks(in_path, chunk_items):
+            stats["items"] += len(chunk)
+            # sort each type on its own, so the chunk sort never sees ints
+            # and floats together (radix_sort would compare them as doubles)
+            for typecode, values in split_by_typecode(chunk).items():
+                result = ALGORITHMS[algorithm](values)
+                values = values if result is None else result
+                path, size = write_run(values, directory, typecode)
+                paths.append(path)
+                stats["bytes_spilled"] += size
+        stats["runs"] = len(paths)
+
+        # too many runs to give each one a read buffer: merge groups of fan_in
+        # runs into longer runs until the final merge fits in memory_limit
+        while len(paths) > fan_in:
+            stats["merge_passes"] += 1
+            next_paths = []
+            by_typecode = {}
+            for path in paths:
+                by_typecode.setdefault(run_typecode(path), []).append(path)
+            for typed_paths in by_typecode.values():
+                for g in range(0, len(typed_paths), fan_in):
+                    group = typed_paths[g:g + fan_in]
+                    if len(group) == 1:
+                        next_paths.append(group[0])
+                        continue
+                    path, size = merge_runs_to_file(group, directory, MERGE_BUFFER_BYTES)
+                    next_paths.append(path)
+                    stats["bytes_spilled"] += size
+            paths = next_paths
+
+        buffer_bytes = max(1, memory_limit // (len(paths) + 1))
+        with open(out_path, "w") as out:
+            block = []
+            for value in heapq.merge(*(read_run(path, buffer_bytes) for path in paths)):
+                block.append(format_number(value))
+                if len(block) == 8192:
+                    out.writelines(block)
+                    block = []
+            out.writelines(block)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sort a newline-delimited file of numbers larger than RAM")
+    parser.add_argument("in_path", help="Input file, one number per line")
+    parser.add_argument("out_path", help="Output file")
+    parser.add_argument("--memory-limit", type=int, default=64 * 1024 * 1024, help="Approximate memory budget in bytes")
+    parser.add_argument("--algorithm", default="introsort", choices=sorted(ALGORITHMS), help="In-memory sort used for each chunk")
+    parser.add_argument("--tmp-dir", default=None, help="Directory for the temporary run files")
+    args = parser.parse_args()
+
+    stats = external_sort(args.in_path, args.out_path, args.memory_limit, args.algorithm, args.tmp_dir)
+    print(f"Sorted {stats['items']} numbers: {stats['runs']} runs, "
+          f"{stats['merge_passes']} intermediate merge passes, {stats['bytes_spilled']} bytes spilled")
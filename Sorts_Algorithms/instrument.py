@@ -0,0 +1,259 @@
+import functools
+import tracemalloc
+import types
+from contextlib import contextmanager
+
+import Sort_comparisons
+
+# Opt-in instrumentation for the sorts of Sort_comparisons
+#
+# Nothing here touches the sorting code itself. While instrumentation is on,
+# the module's recursive functions are replaced by depth-tracking variants;
+# they are restored afterwards, so a sort that runs outside of
+# `instrumented()` executes exactly the original code. Comparisons are
+# counted by wrapping the elements (`Counted`) and moves by wrapping the list
+# (`CountingList`, see `counting_list`); the `instrument` decorator does both.
+# Swaps are not counted separately: most sorts swap inline, which the list
+# only sees as two moves.
+#
+# Usage:
+#     with instrumented() as counters:
+#         B = counting_list(A, counters)
+#         Sort_comparisons.introsort(B)
+#     print(counters.as_dict())
+
+
+class SortCounters:
+    """
+    Counters of one instrumented run.
+
+    Attributes:
+        comparisons: Comparisons between elements (None if the elements were
+            not wrapped, e.g. for counting and radix sort).
+        moves: Element writes into the list being sorted; a swap is two
+            moves. Writes into buffers or new lists are not seen.
+        calls: Calls of the recursive functions of Sort_comparisons.
+        max_depth: Deepest nesting of those calls.
+        peak_bytes: Peak memory allocated during the run (tracemalloc).
+    """
+
+    FIELDS = ("comparisons", "moves", "calls", "max_depth", "peak_bytes")
+
+    def __init__(self):
+        self.comparisons = None
+        self.moves = 0
+        self.calls = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.peak_bytes = 0
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self):
+        return f"SortCounters({', '.join(f'{k}={v}' for k, v in self.as_dict().items())})"
+
+
+class Counted:
+    """An element that counts every comparison made on it."""
+
+    __slots__ = ("value", "counters")
+
+    def __init__(self, value, counters):
+        self.value = value
+        self.counters = counters
+
+    def __lt__(self, other):
+        self.counters.comparisons += 1
+        return self.value < (other.value if isinstance(other, Counted) else other)
+
+    def __le__(self, other):
+        self.counters.comparisons += 1
+        return self.value <= (other.value if isinstance(other, Counted) else other)
+
+    def __gt__(self, other):
+        self.counters.comparisons += 1
+        return self.value > (other.value if isinstance(other, Counted) else other)
+
+    def __ge__(self, other):
+        self.counters.comparisons += 1
+        return self.value >= (other.value if isinstance(other, Counted) else other)
+
+    def __eq__(self, other):
+        self.counters.comparisons += 1
+        return self.value == (other.value if isinstance(other, Counted) else other)
+
+    def __ne__(self, other):
+        self.counters.comparisons += 1
+        return self.value != (other.value if isinstance(other, Counted) else other)
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class CountedStable(Counted):
+    """A Counted int or str. Equal ints or strs can't be told apart, so sorts
+    may treat these as they treat the plain values; `instrumented()` adds this
+    class to Sort_comparisons.NETWORK_STABLE_TYPES, so merge_sort takes the
+    same sorting-network path as for the unwrapped list."""
+
+    __slots__ = ()
+
+
+class CountingList(list):
+    """A list that counts the element writes made through indexing."""
+
+    __slots__ = ("counters",)
+
+    def __init__(self, items, counters):
+        super().__init__(items)
+        self.counters = counters
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self.counters.moves += len(value)
+        else:
+            self.counters.moves += 1
+        super().__setitem__(index, value)
+
+
+def recursive_functions(module):
+    """Names of the functions of `module` that call themselves by name."""
+    return [name for name, func in vars(module).items()
+            if isinstance(func, types.FunctionType) and name in func.__code__.co_names]
+
+
+def depth_tracking(func, counters):
+    """Wraps a recursive function so that it counts its calls and nesting depth.
+    Its recursive calls go through the module global, i.e. through the wrapper."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        counters.calls += 1
+        counters.depth += 1
+        if counters.depth > counters.max_depth:
+            counters.max_depth = counters.depth
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counters.depth -= 1
+    return wrapper
+
+
+_active = False
+
+@contextmanager
+def instrumented(counters=None, memory=True):
+    """
+    Context manager that swaps the counting variants into Sort_comparisons
+    for the duration of the block.
+
+    Args:
+        counters (SortCounters, optional): Where to count, a new one by default.
+        memory (bool): Also trace allocations with tracemalloc (slower).
+
+    Yields:
+        SortCounters: The counters, complete once the block exits.
+    """
+    global _active
+    if _active:
+        raise RuntimeError("instrumented() blocks cannot be nested.")
+    counters = SortCounters() if counters is None else counters
+    originals = {name: getattr(Sort_comparisons, name) for name in recursive_functions(Sort_comparisons)}
+    originals["NETWORK_STABLE_TYPES"] = Sort_comparisons.NETWORK_STABLE_TYPES
+    for name, func in originals.items():
+        if name != "NETWORK_STABLE_TYPES":
+            setattr(Sort_comparisons, name, depth_tracking(func, counters))
+    Sort_comparisons.NETWORK_STABLE_TYPES = (*Sort_comparisons.NETWORK_STABLE_TYPES, CountedStable)
+    started = memory and not tracemalloc.is_tracing()
+    if memory:
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    _active = True
+    try:
+        yield counters
+    finally:
+        if memory:
+            counters.peak_bytes = tracemalloc.get_traced_memory()[1] - baseline
+            if started:
+                tracemalloc.stop()
+        for name, func in originals.items():
+            setattr(Sort_comparisons, name, func)
+        _active = False
+
+
+def counting_list(A, counters, compare=True):
+    """Returns a CountingList copy of A counting into `counters`, with the
+    elements wrapped in Counted (CountedStable for ints and strs) if compare=True."""
+    if not compare:
+        return CountingList(A, counters)
+    if counters.comparisons is None:
+        counters.comparisons = 0
+    return CountingList([counted(x, counters) for x in A], counters)
+
+
+def counted(x, counters):
+    """x wrapped in Counted, or in CountedStable for ints and strs."""
+    return (CountedStable if type(x) in Sort_comparisons.NETWORK_STABLE_TYPES else Counted)(x, counters)
+
+
+def counting_key(key, counters):
+    """A key function for wrapped elements: calls `key` on the plain value and
+    wraps the result, so the comparisons of the keys are counted."""
+    return lambda c: counted(key(c.value), counters)
+
+
+def unwrap(items):
+    """The plain values of a list that may hold Counted elements."""
+    return [x.value if isinstance(x, Counted) else x for x in items]
+
+
+def instrument(sort_func=None, *, compare=True, memory=True):
+    """
+    Decorator that runs every call of a sort under `instrumented`.
+
+    The decorated sort is called as before (A first, then its own arguments).
+    A list argument is sorted through a CountingList, with its elements
+    wrapped in `Counted` if compare=True; pass compare=False for sorts that
+    need the raw values (counting, radix, pigeonhole and flash sort). A
+    `key=` function is called on the plain elements, and the comparisons of
+    its results are counted. The counters of the latest call are kept in
+    `wrapper.last_counters`.
+
+    Usage:
+        @instrument
+        def my_sort(A): ...
+
+        counted_introsort = instrument(introsort)
+        counted_introsort(A)
+        print(counted_introsort.last_counters)
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(A, *args, **kwargs):
+            counters = SortCounters()
+            if not isinstance(A, list):
+                with instrumented(counters, memory):
+                    result = func(A, *args, **kwargs)
+                wrapper.last_counters = counters
+                return result
+            B = counting_list(A, counters, compare)
+            if compare and kwargs.get("key") is not None:
+                kwargs = {**kwargs, "key": counting_key(kwargs["key"], counters)}
+            with instrumented(counters, memory):
+                result = func(B, *args, **kwargs)
+            A[:] = unwrap(B)
+            if result is B:
+                result = A
+            elif isinstance(result, list):
+                result = unwrap(result)
+            wrapper.last_counters = counters
+            return result
+        wrapper.last_counters = None
+        return wrapper
+    return decorate if sort_func is None else decorate(sort_func)
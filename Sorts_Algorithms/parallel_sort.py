@@ -0,0 +1,158 @@
+import heapq
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from Sort_comparisons import (
+    adaptive_sort,
+    block_merge_sort,
+    heapsort,
+    insertion_sort,
+    introsort,
+    merge_sort,
+    merge_sort_buffered,
+    quicksort,
+    radix_sort,
+)
+
+# Sorts that can run on a chunk; each one is called as ALGORITHMS[name](chunk)
+# and either sorts the chunk in place or returns the sorted list.
+ALGORITHMS = {
+    "merge_sort": merge_sort,
+    "merge_sort_buffered": merge_sort_buffered,
+    "adaptive_sort": adaptive_sort,
+    "block_merge_sort": block_merge_sort,
+    "heapsort": heapsort,
+    "insertion_sort": insertion_sort,
+    "introsort": introsort,
+    "quicksort": lambda A: quicksort(A, 0, len(A) - 1),
+    "radix_sort": radix_sort,
+}
+
+# Below this many elements per worker the process start-up costs more than it saves
+MIN_CHUNK = 10000
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def sort_chunk(algorithm, chunk):
+    """Worker: sorts one chunk with the named algorithm and returns it."""
+    result = ALGORITHMS[algorithm](chunk)
+    return chunk if result is None else result
+
+
+def sort_shared_chunk(algorithm, name, typecode, start, stop):
+    """Worker: sorts items [start, stop) of the shared memory block `name`
+    (an array of `typecode`) and writes them back in place."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # released before close(), even if the sort raises
+        with shm.buf.cast(typecode) as view:
+            chunk = sort_chunk(algorithm, view[start:stop].tolist())
+            view[start:stop] = array(typecode, chunk)
+    finally:
+        shm.close()
+
+
+def numeric_typecode(A):
+    """Returns the array typecode ('q' for int64, 'd' for float) the values
+    of A can be stored as in shared memory, or None if they need pickling."""
+    if all(type(x) is int for x in A):
+        if INT64_MIN <= min(A) and max(A) <= INT64_MAX:
+            return "q"
+        return None
+    if all(type(x) is float for x in A):
+        return "d"
+    return None
+
+
+def kway_merge(runs):
+    """
+    Merges k sorted lists into one sorted list with heapq.merge, whose heap
+    of run iterators is kept in C. Ties go to the earlier run, so the merge
+    is stable.
+
+    Time complexity: O(n lg k)
+    """
+    return list(heapq.merge(*runs))
+
+
+def chunk_bounds(n, chunks):
+    """Splits range(n) into `chunks` contiguous (start, stop) pairs of nearly equal size."""
+    size, extra = divmod(n, chunks)
+    bounds = []
+    start = 0
+    for c in range(chunks):
+        stop = start + size + (1 if c < extra else 0)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def parallel_sort(A: list, workers: int = None, algorithm: str = "merge_sort") -> list:
+    """
+    Sorts a list on several cores: the input is split into one chunk per
+    worker, the chunks are sorted in a ProcessPoolExecutor with one of the
+    algorithms from Sort_comparisons, and the sorted chunks are combined
+    with a heap-based k-way merge.
+
+    Lists of int64-range integers or of floats are handed to the workers
+    through multiprocessing.shared_memory, so the data is not pickled;
+    anything else is pickled chunk by chunk.
+
+    Args:
+        A (list): The list to be sorted. It is not modified.
+        workers (int, optional): Number of worker processes, defaults to os.cpu_count().
+        algorithm (str): Name of the per-chunk sort, one of ALGORITHMS.
+
+    Returns:
+        list: A new sorted list.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {sorted(ALGORITHMS)}.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    n = len(A)
+    workers = max(1, min(workers, n // MIN_CHUNK))
+    if workers == 1:
+        return sort_chunk(algorithm, list(A))
+
+    bounds = chunk_bounds(n, workers)
+    typecode = numeric_typecode(A)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if typecode is None:
+            runs = list(executor.map(sort_chunk, [algorithm] * workers, [A[start:stop] for start, stop in bounds]))
+        else:
+            data = array(typecode, A)
+            shm = shared_memory.SharedMemory(create=True, size=len(data) * data.itemsize)
+            try:
+                # released before close()/unlink(), so a worker's exception
+                # is not replaced by a BufferError and the block is not leaked
+                with shm.buf.cast(typecode) as view:
+                    view[:] = data
+                    del data
+                    futures = [executor.submit(sort_shared_chunk, algorithm, shm.name, typecode, start, stop)
+                               for start, stop in bounds]
+                    for future in futures:
+                        future.result()
+                    runs = [view[start:stop].tolist() for start, stop in bounds]
+            finally:
+                shm.close()
+                shm.unlink()
+    return kway_merge(runs)
+
+
+if __name__ == "__main__":
+    import random
+
+    n = 1_000_000
+    A = [random.random() for _ in range(n)]
+    for workers in (1, 2, 4, 8):
+        start_time = time.perf_counter()
+        result = parallel_sort(A, workers=workers)
+        end_time = time.perf_counter()
+        assert result == sorted(A)
+        print(f"parallel_sort, {workers} worker(s), n={n}: {end_time - start_time:.3f} seconds")
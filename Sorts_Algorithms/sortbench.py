@@ -0,0 +1,230 @@
+import argparse
+import csv
+import json
+import random
+import statistics
+import time
+
+from instrument import SortCounters, instrument
+from Sort_comparisons import (
+    adaptive_sort,
+    block_merge_sort,
+    bottom_up_quicksort,
+    bubble_sort,
+    cocktail_shaker_sort,
+    count_sort,
+    flash_sort,
+    heapsort,
+    heapsort_bottom_up,
+    heapsort_dary,
+    insertion_sort,
+    introsort,
+    merge_sort,
+    merge_sort_buffered,
+    pigeonhole_sort,
+    quicksort,
+    radix_sort,
+    randomized_quicksort,
+    selection_sort,
+    smart_sort,
+    zipf_list,
+)
+
+# Every entry is called as SORTS[name](A) and either sorts A in place or
+# returns the sorted list
+SORTS = {
+    "quicksort": lambda A: quicksort(A, 0, len(A) - 1),
+    "quicksort_three_way": lambda A: quicksort(A, 0, len(A) - 1, three_way=True),
+    "randomized_quicksort": lambda A: randomized_quicksort(A, 0, len(A) - 1),
+    "bottom_up_quicksort": bottom_up_quicksort,
+    "introsort": introsort,
+    "insertion_sort": insertion_sort,
+    "merge_sort": merge_sort,
+    "merge_sort_buffered": merge_sort_buffered,
+    "adaptive_sort": adaptive_sort,
+    "block_merge_sort": block_merge_sort,
+    "bubble_sort": bubble_sort,
+    "selection_sort": selection_sort,
+    "cocktail_shaker_sort": cocktail_shaker_sort,
+    "heapsort": heapsort,
+    "heapsort_bottom_up": heapsort_bottom_up,
+    "heapsort_dary": heapsort_dary,
+    "count_sort": count_sort,
+    "radix_sort": radix_sort,
+    "pigeonhole_sort": pigeonhole_sort,
+    "flash_sort": flash_sort,
+    "smart_sort": smart_sort,
+}
+
+# Θ(n^2) sorts are skipped above QUADRATIC_LIMIT elements
+QUADRATIC = {"insertion_sort", "bubble_sort", "selection_sort", "cocktail_shaker_sort"}
+QUADRATIC_LIMIT = 5000
+
+# Sorts that need the raw values, so their elements can't be wrapped to count comparisons
+# (smart_sort would see the wrapped elements and choose differently)
+NON_COMPARISON = {"count_sort", "radix_sort", "pigeonhole_sort", "flash_sort", "smart_sort"}
+
+# Every generator is called as DISTRIBUTIONS[name](n, rng) and returns n ints
+DISTRIBUTIONS = {
+    "uniform": lambda n, rng: [rng.randrange(n) for _ in range(n)],
+    "sorted": lambda n, rng: list(range(n)),
+    "reversed": lambda n, rng: list(range(n, 0, -1)),
+    "few-unique": lambda n, rng: [rng.randrange(8) for _ in range(n)],
+    "organ-pipe": lambda n, rng: list(range(n // 2)) + list(range(n - n // 2, 0, -1)),
+    "zipf": lambda n, rng: zipf_list(n, 1.5, 100, rng),
+    "wide": lambda n, rng: [rng.getrandbits(32) for _ in range(n)],
+}
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in [0, 100]) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-q * len(ordered) // 100))
+    return ordered[int(rank) - 1]
+
+
+def time_sort(sort_func, A, expected, trials):
+    """
+    Times sort_func on `trials` fresh copies of A.
+
+    Returns:
+        tuple: (list of running times in seconds, whether every result matched expected)
+    """
+    times = []
+    correct = True
+    for _ in range(trials):
+        B = A.copy()
+        start_time = time.perf_counter()
+        result = sort_func(B)
+        end_time = time.perf_counter()
+        times.append(end_time - start_time)
+        if (B if result is None else result) != expected:
+            correct = False
+    return times, correct
+
+
+def count_operations(sort_func, A, compare=True):
+    """Runs sort_func once on a copy of A under `instrument` and returns its
+    counters as a dict (see instrument.SortCounters)."""
+    counted = instrument(sort_func, compare=compare)
+    counted(A.copy())
+    return counted.last_counters.as_dict()
+
+
+def run_benchmark(algorithms=None, distributions=None, sizes=(1000,), trials=5, seed=None, counters=False):
+    """
+    Benchmarks sorting algorithms over generated input distributions.
+
+    Args:
+        algorithms (list, optional): Names from SORTS, defaults to all of them.
+        distributions (list, optional): Names from DISTRIBUTIONS, defaults to all of them.
+        sizes (iterable): Input sizes.
+        trials (int): Timed runs per (algorithm, distribution, size), each on a fresh copy.
+        seed (int, optional): Seed for the input generators.
+        counters (bool): Also run every sort once (untimed) under
+            instrumentation and add its comparisons, moves, calls,
+            max_depth and peak_bytes to the row.
+
+    Returns:
+        list: One dict per measurement with the algorithm, distribution, n,
+            trials, median, p95, stdev and mean (seconds), and `correct`
+            (result equal to sorted()). A run that raised has `error` set
+            instead of timings.
+    """
+    algorithms = list(SORTS) if algorithms is None else algorithms
+    distributions = list(DISTRIBUTIONS) if distributions is None else distributions
+    for name in algorithms:
+        if name not in SORTS:
+            raise ValueError(f"Unknown algorithm {name!r}, expected one of {sorted(SORTS)}.")
+    for name in distributions:
+        if name not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {name!r}, expected one of {sorted(DISTRIBUTIONS)}.")
+
+    rng = random.Random(seed)
+    results = []
+    for n in sizes:
+        for distribution in distributions:
+            A = DISTRIBUTIONS[distribution](n, rng)
+            expected = sorted(A)
+            for algorithm in algorithms:
+                if algorithm in QUADRATIC and n > QUADRATIC_LIMIT:
+                    continue
+                row = {"algorithm": algorithm, "distribution": distribution, "n": n, "trials": trials}
+                try:
+                    times, correct = time_sort(SORTS[algorithm], A, expected, trials)
+                    if counters:
+                        # the counting wrappers add a frame per recursive call,
+                        # so this run can fail where the timed ones did not
+                        row.update(count_operations(SORTS[algorithm], A, algorithm not in NON_COMPARISON))
+                except Exception as e:
+                    row.update(median=None, p95=None, stdev=None, mean=None, correct=False,
+                               error=f"{type(e).__name__}: {e}")
+                else:
+                    row.update(median=statistics.median(times), p95=percentile(times, 95),
+                               stdev=statistics.stdev(times) if trials > 1 else 0.0,
+                               mean=statistics.fmean(times), correct=correct, error=None)
+                results.append(row)
+    return results
+
+
+FIELDS = ["algorithm", "distribution", "n", "trials", "median", "p95", "stdev", "mean", "correct", "error",
+          *SortCounters.FIELDS]
+
+
+def write_json(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def write_csv(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def print_table(results):
+    counters = any("comparisons" in row for row in results)
+    header = f"{'algorithm':<22} {'distribution':<12} {'n':>9} {'median (s)':>12} {'p95 (s)':>12} {'stdev (s)':>12}  ok"
+    if counters:
+        header += f"  {'comparisons':>12} {'moves':>10} {'depth':>6} {'peak bytes':>11}"
+    print(header)
+    for row in results:
+        if row["error"] is not None:
+            print(f"{row['algorithm']:<22} {row['distribution']:<12} {row['n']:>9}  {row['error']}")
+            continue
+        line = (f"{row['algorithm']:<22} {row['distribution']:<12} {row['n']:>9} "
+                f"{row['median']:>12.6f} {row['p95']:>12.6f} {row['stdev']:>12.6f}  {'yes' if row['correct'] else ' NO'}")
+        if counters:
+            comparisons = "-" if row["comparisons"] is None else row["comparisons"]
+            line += (f"  {comparisons:>12} {row['moves']:>10} "
+                     f"{row['max_depth']:>6} {row['peak_bytes']:>11}")
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sorting algorithms of Sort_comparisons")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="Input sizes")
+    parser.add_argument("--distributions", nargs="+", default=None, choices=list(DISTRIBUTIONS),
+                        help="Input distributions (default: all)")
+    parser.add_argument("--algorithms", nargs="+", default=None, choices=list(SORTS),
+                        help="Algorithms to run (default: all)")
+    parser.add_argument("--trials", type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the input generators")
+    parser.add_argument("--counters", action="store_true",
+                        help="Also count comparisons, moves, recursion depth and peak memory")
+    parser.add_argument("--json", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--csv", default=None, help="Write the results to this CSV file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.algorithms, args.distributions, args.sizes, args.trials, args.seed, args.counters)
+    print_table(results)
+    if args.json:
+        write_json(results, args.json)
+    if args.csv:
+        write_csv(results, args.csv)
+    return results
+
+
+if __name__ == "__main__":
+    main()